@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Archive-scale lookups: next_sequence() over a flat outputs directory versus
+the SQLite index (ArchiveIndex.reserve / find) holding the same artifacts.
+
+Creates --files empty '<NNNN> - stem.json/.pdf' pairs in a temp directory
+(flat) and the matching index rows, then times:
+  - next_sequence: listing the flat directory (what every run used to do)
+  - reserve      : taking the next sequence number from the index
+  - find         : latest PDF of one task by custom id
+  - grep         : the same lookup by scanning filenames
+
+Usage: python benchmarks/bench_archive.py [--files 100000]
+"""
+
+import sys
+import time
+import argparse
+import tempfile
+from pathlib import Path
+from datetime import datetime, timezone
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from cli.archive import ArchiveIndex  # noqa: E402
+from cli.make_pdfs import next_sequence  # noqa: E402
+
+def timed(fn, runs: int = 5):
+    best = float("inf")
+    for _ in range(runs):
+        t0 = time.perf_counter()
+        out = fn()
+        best = min(best, time.perf_counter() - t0)
+    return best, out
+
+def main():
+    ap = argparse.ArgumentParser(description="Compare directory scans with the SQLite output index.")
+    ap.add_argument("--files", type=int, default=100_000, help="Number of JSON/PDF pairs (default: 100000)")
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        out = Path(tmp)
+        index = ArchiveIndex(out)
+        now = datetime.now(timezone.utc).isoformat(timespec="seconds")
+        rows = []
+        for i in range(1, args.files + 1):
+            base = f"{i:04d} - PERSON-{i}__Task_{i}"
+            (out / f"{base}.json").touch()
+            (out / f"{base}.pdf").touch()
+            rows.append((i, f"PERSON-{i}", str(9000 + i), f"PERSON-{i}", "pdf", f"{base}.pdf", now))
+        index.db.execute("BEGIN")
+        index.db.executemany(
+            "INSERT INTO artifacts (seq, task_key, task_id, custom_id, format, path, created_at) VALUES (?, ?, ?, ?, ?, ?, ?)",
+            rows,
+        )
+        index.db.execute("COMMIT")
+
+        key = f"PERSON-{args.files // 2}"
+        scan, _ = timed(lambda: next_sequence(out))
+        reserve, _ = timed(lambda: index.reserve(1, seed=lambda: next_sequence(out)))
+        find, hit = timed(lambda: index.find(key, "pdf"))
+        grep, _ = timed(lambda: max(p.name for p in out.iterdir() if f" - {key}__" in p.name and p.suffix == ".pdf"))
+        index.close()
+
+    print(f"files        : {2 * args.files} in one directory")
+    print(f"next_sequence: {scan * 1000:9.2f} ms")
+    print(f"reserve      : {reserve * 1000:9.2f} ms")
+    print(f"find         : {find * 1000:9.2f} ms  -> {hit[0]['path']}")
+    print(f"grep names   : {grep * 1000:9.2f} ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Compare output backends (pdf, html, md) on a synthetic task.
+
+Each backend renders the same build_document() output; the report shows the
+median time per backend and the speedup relative to PDF.
+
+Usage: python benchmarks/bench_backends.py [--sections 200] [--runs 5]
+"""
+
+import sys
+import json
+import time
+import argparse
+import statistics
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from pdf_generator.backends import BACKENDS, get_backend  # noqa: E402
+from pdf_generator.renderers import iter_document  # noqa: E402
+
+def synthetic_task(sections: int) -> dict:
+    ops = []
+    for i in range(sections):
+        ops += [
+            {"insert": f"Section {i}"}, {"insert": "\n", "attributes": {"header": 2}},
+            {"insert": "Plain text with "}, {"insert": "bold & <escaped>", "attributes": {"bold": True}},
+            {"insert": " and "}, {"insert": "a link", "attributes": {"link": "https://example.com/?a=1&b=2"}},
+            {"insert": " sentence. " * 12 + "\n"},
+            {"insert": "bullet one"}, {"insert": "\n", "attributes": {"list": "bullet"}},
+            {"insert": "bullet two"}, {"insert": "\n", "attributes": {"list": "bullet"}},
+        ]
+    md = "\n".join(f"## Part {i}\nSome **bold** text with [link](https://x.y/{i})\n- item\n" for i in range(sections // 4))
+    return {
+        "name": "Benchmark task",
+        "url": "https://app.clickup.com/t/1/BENCH-1",
+        "markdown_description": md,
+        "custom_fields": [
+            {"name": "AI Summary", "type": "text", "value_richtext": json.dumps({"ops": ops})},
+            {"name": "Contributors to this value exchange", "type": "list_relationship",
+             "value": [{"name": f"Person {i}", "url": f"https://u/{i}"} for i in range(20)]},
+        ],
+        "checklists": [{"name": "Checklist", "items": [{"name": f"Item {i}", "resolved": i % 2} for i in range(50)]}],
+    }
+
+def main():
+    ap = argparse.ArgumentParser(description="Benchmark output backends on a synthetic task.")
+    ap.add_argument("--sections", type=int, default=200, help="Rich-text sections in the synthetic task (default: 200)")
+    ap.add_argument("--runs", type=int, default=5, help="Runs per backend; the median is reported (default: 5)")
+    args = ap.parse_args()
+
+    task = synthetic_task(args.sections)
+    timings = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for fmt in BACKENDS:
+            backend = get_backend(fmt)
+            out = Path(tmp) / f"bench.{backend.suffix}"
+            runs = []
+            for _ in range(args.runs):
+                t0 = time.perf_counter()
+                backend.write(iter_document(task), out, title=task["name"])
+                runs.append(time.perf_counter() - t0)
+            timings[fmt] = (statistics.median(runs), out.stat().st_size)
+
+    base = timings["pdf"][0]
+    for fmt, (secs, size) in timings.items():
+        print(f"{fmt:5s}: {secs * 1000:8.1f} ms  {size / 1024:8.1f} KiB  ({base / secs:5.1f}x vs pdf)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Benchmark the single-pass inline scanner (utils.md_inline_to_html) against the
+previous multi-pass implementation (esc, then link regex, then bold regex) on
+two synthetic corpora:
+  - dense : every line is built from markup-heavy fragments (links, bold,
+            italics, bare and task URLs, "[id] ClickUp Task")
+  - prose : --plain-share of the lines are plain sentences (the common case in
+            task fields, served by the fast path), the rest as in dense
+
+The scanner is SLOWER than the previous md_inline_to_html ("legacy") on
+markup-dense text, about 0.4x its speed here, and about 0.8x on prose. It
+finds roughly three times as many matches (italics, bare URLs and task
+references as well as links and bold), and each one costs a Python callback.
+For reference only, a second, constructed baseline ("legacy+url") chains
+legacy with a separate bare-URL pass. It was never shipped; it only shows
+what doing the same work in several passes would cost.
+Also reports the per-op cost Quill text pays for bare-URL detection
+(urlify_text) over plain escaping.
+
+Implementations are interleaved within each run, so drift in machine load
+affects them alike.
+
+Usage: python benchmarks/bench_inline.py [--lines 200000] [--runs 3] [--plain-share 0.8]
+"""
+
+import re
+import sys
+import time
+import random
+import argparse
+import statistics
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from pdf_generator.utils import esc, md_inline_to_html, urlify_text  # noqa: E402
+
+# --- previous implementation, kept here as the baseline ---
+_bold_re = re.compile(r"\*\*(.+?)\*\*")
+_link_re = re.compile(r"\[([^\]]+)\]\(([^)]+)\)")
+
+def legacy_md_inline_to_html(s: str) -> str:
+    if not s:
+        return ""
+    t = esc(s)
+    t = _link_re.sub(lambda m: f'<a href="{esc(m.group(2))}">{esc(m.group(1))}</a>', t)
+    t = _bold_re.sub(lambda m: f"<b>{esc(m.group(1))}</b>", t)
+    return t
+
+_url_re = re.compile(r'(?<!href=")https?://[^\s<>"\'()\[\]]+')
+
+def legacy_with_urls(s: str) -> str:
+    return _url_re.sub(lambda m: f'<a href="{m.group(0)}">{m.group(0)}</a>', legacy_md_inline_to_html(s))
+
+FRAGMENTS = [
+    "Plain sentence about the quarterly plan & budget <draft>.",
+    "We agreed on **three priorities** for next month.",
+    "Notes in [the doc](https://docs.example.com/d/abc?x=1&y=2) cover it.",
+    "Follow-up: https://app.clickup.com/t/20419954/PERSON-20340 (owner: Sam).",
+    "See *draft* numbers and https://example.com/report.pdf, then reply.",
+    "[8699x95rb] ClickUp Task",
+    "Nothing special here, just words and more words and a few more words.",
+]
+
+PLAIN = [
+    "Plain sentence about the quarterly plan and budget for the next release.",
+    "Nothing special here, just words and more words and a few more words.",
+    "The team reviewed the open questions and agreed to revisit them on Friday.",
+]
+
+def corpus(lines: int, seed: int = 7, plain_share: float = 0.0):
+    rnd = random.Random(seed)
+    return [
+        " ".join(rnd.choice(PLAIN if rnd.random() < plain_share else FRAGMENTS) for _ in range(rnd.randint(1, 4)))
+        for _ in range(lines)
+    ]
+
+def quill_ops(lines):
+    """Quill stores text as short runs between formatting changes."""
+    return [w for ln in lines for w in ln.split("**")]
+
+def timeit(fns, lines, runs):
+    """Median seconds per implementation, interleaving them within each run."""
+    out = [[] for _ in fns]
+    for _ in range(runs):
+        for times, fn in zip(out, fns):
+            t0 = time.perf_counter()
+            for ln in lines:
+                fn(ln)
+            times.append(time.perf_counter() - t0)
+    return [statistics.median(t) for t in out]
+
+def main():
+    ap = argparse.ArgumentParser(description="Benchmark the inline scanner against the legacy multi-pass version.")
+    ap.add_argument("--lines", type=int, default=200_000, help="Corpus size in lines (default: 200000)")
+    ap.add_argument("--runs", type=int, default=3, help="Runs per implementation; the median is reported (default: 3)")
+    ap.add_argument("--plain-share", type=float, default=0.8, help="Share of plain fragments in the prose corpus (default: 0.8)")
+    args = ap.parse_args()
+
+    for name, share in (("dense", 0.0), ("prose", args.plain_share)):
+        lines = corpus(args.lines, plain_share=share)
+        mb = sum(len(x) for x in lines) / 2**20
+        old, new, both = timeit((legacy_md_inline_to_html, md_inline_to_html, legacy_with_urls), lines, args.runs)
+        print(f"{name} corpus: {args.lines} lines, {mb:.1f} MB")
+        print(f"  legacy    : {old * 1000:8.1f} ms  ({mb / old:6.1f} MB/s)  previous md_inline_to_html (links + bold)")
+        print(f"  scanner   : {new * 1000:8.1f} ms  ({mb / new:6.1f} MB/s)  {old / new:4.2f}x legacy's speed"
+              + (" (slower)" if new > old else ""))
+        print(f"  legacy+url: {both * 1000:8.1f} ms  ({mb / both:6.1f} MB/s)  constructed reference, "
+              f"scanner {both / new:4.2f}x its speed")
+
+    ops = quill_ops(corpus(args.lines, plain_share=args.plain_share))
+    plain, urls = timeit((esc, urlify_text), ops, args.runs)
+    print(f"quill ops : {len(ops)} runs, esc {plain * 1000:.1f} ms, urlify_text {urls * 1000:.1f} ms "
+          f"(+{urls / plain - 1:.0%} for bare-URL links)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+PDF size before/after the --optimize pass (pdf_generator.optimize) on a small
+benchmark corpus:
+  - rich      : the synthetic task of bench_backends.py (headings, links, lists)
+  - large     : a 2 MB rich-text field (bench_large_field.py)
+  - attached  : a task embedding two copies of the same image from different
+                paths and two copies of a text file (--attachments embed)
+Each document is also rendered with --embed-fonts to show what embedding
+subsetted TrueType fonts costs, and how much of it the pass wins back.
+
+Usage: python benchmarks/bench_optimize.py [--sections 200] [--mb 2] [--no-fonts]
+"""
+
+import sys
+import shutil
+import argparse
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from reportlab import rl_config  # noqa: E402
+from bench_backends import synthetic_task as rich_task  # noqa: E402
+from bench_large_field import synthetic_task as large_task  # noqa: E402
+from pdf_generator.backends import get_backend  # noqa: E402
+from pdf_generator.optimize import optimize_file  # noqa: E402
+from pdf_generator.renderers import iter_document  # noqa: E402
+
+def attached_task(tmp: Path):
+    from PIL import Image, ImageDraw
+
+    img = Image.new("RGB", (900, 600), (240, 244, 250))
+    draw = ImageDraw.Draw(img)
+    for i in range(0, 900, 30):
+        draw.line((i, 0, 900 - i, 600), fill=(31, 111, 235), width=3)
+    files = {}
+    for name in ("chart.png", "chart-copy.png"):
+        img.save(tmp / name)
+        files[name] = tmp / name
+    for name in ("minutes.txt", "minutes-v2.txt"):
+        (tmp / name).write_text("Minutes of the quarterly review.\n" * 2000, encoding="utf-8")
+        files[name] = tmp / name
+    atts = [{"id": n, "title": n, "mimetype": "image/png" if n.endswith(".png") else "text/plain"} for n in files]
+    task = {"name": "Attachments", "custom_fields": [], "attachments": atts}
+    return task, files
+
+def measure(task, out: Path, embed_fonts=None, **doc):
+    get_backend("pdf", embed_fonts=embed_fonts).write(iter_document(task, **doc), out, title=task["name"])
+    return optimize_file(out)
+
+def main():
+    ap = argparse.ArgumentParser(description="Report PDF sizes before and after the optimisation pass.")
+    ap.add_argument("--sections", type=int, default=200, help="Sections in the rich task (default: 200)")
+    ap.add_argument("--mb", type=float, default=2.0, help="Size of the large rich-text field in MB (default: 2)")
+    ap.add_argument("--no-fonts", action="store_true", help="Skip the --embed-fonts variants")
+    args = ap.parse_args()
+
+    rl_config.invariant = 1  # stable sizes between runs
+    tmp = Path(tempfile.mkdtemp())
+    try:
+        att, files = attached_task(tmp)
+        corpus = [
+            ("rich", rich_task(args.sections), {}),
+            ("large", large_task(args.mb), {}),
+            ("attached", att, {"attachments": files}),
+        ]
+        variants = [("helvetica", None)] + ([] if args.no_fonts else [("embedded", "")])
+        total_before = total_after = 0
+        print(f"{'document':10s} {'fonts':10s} {'before':>10s} {'after':>10s} {'saved':>7s}")
+        for label, task, doc in corpus:
+            for fonts, embed in variants:
+                before, after = measure(task, tmp / f"{label}-{fonts}.pdf", embed, **doc)
+                total_before += before
+                total_after += after
+                print(f"{label:10s} {fonts:10s} {before / 1024:8.1f}KB {after / 1024:8.1f}KB "
+                      f"{100 * (1 - after / before):6.1f}%")
+        print(f"{'total':21s} {total_before / 1024:8.1f}KB {total_after / 1024:8.1f}KB "
+              f"{100 * (1 - total_after / total_before):6.1f}%")
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Startup benchmark for the make-pdfs CLI.
+
+Runs `make-pdfs --help` under `python -X importtime` and fails (exit 1) if
+- the command itself fails (non-zero exit, or no usage text), since a CLI
+  that crashes at startup is fast and imports nothing heavy, or
+- the median wall time (interpreter start included) exceeds the budget, or
+- any heavy dependency (requests, dotenv, ReportLab) is imported before a
+  stage actually needs it.
+
+Usage: python benchmarks/bench_startup.py [--budget-ms 100] [--runs 5]
+"""
+
+import os
+import re
+import sys
+import time
+import argparse
+import statistics
+import subprocess
+from pathlib import Path
+
+SRC = Path(__file__).resolve().parent.parent / "src"
+HEAVY = ("requests", "dotenv", "reportlab", "urllib3")
+
+_ENTRY = "import sys; sys.argv[0] = 'make-pdfs'; from cli.make_pdfs import main; main()"
+_LINE_RE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)$")
+
+def run_once(args):
+    env = dict(os.environ, PYTHONPATH=str(SRC))
+    t0 = time.perf_counter()
+    p = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", _ENTRY, *args],
+        env=env, capture_output=True, text=True,
+    )
+    wall_ms = (time.perf_counter() - t0) * 1000
+    modules, errors = {}, []
+    for line in p.stderr.splitlines():
+        m = _LINE_RE.match(line)
+        if m:
+            modules[m.group(4)] = int(m.group(2)) / 1000  # cumulative ms
+        elif not line.startswith("import time:"):
+            errors.append(line)
+    if p.returncode != 0 or "usage:" not in p.stdout:
+        raise RuntimeError(f"exit code {p.returncode}" + "".join(f"\n  {line}" for line in errors[-10:]))
+    return wall_ms, modules
+
+def main():
+    ap = argparse.ArgumentParser(description="Guard make-pdfs startup time against regressions.")
+    ap.add_argument("--budget-ms", type=float, default=100.0, help="Max wall time of `make-pdfs --help` (default: 100)")
+    ap.add_argument("--runs", type=int, default=5, help="Number of runs; the median is reported (default: 5)")
+    args = ap.parse_args()
+
+    walls, imports, heavy = [], [], set()
+    for _ in range(args.runs):
+        try:
+            wall_ms, modules = run_once(["--help"])
+        except RuntimeError as e:
+            print(f"❌ make-pdfs --help failed: {e}")
+            sys.exit(1)
+        walls.append(wall_ms)
+        imports.append(modules.get("cli.make_pdfs", 0.0))
+        heavy |= {k.split(".")[0] for k in modules} & set(HEAVY)
+
+    wall, imp = statistics.median(walls), statistics.median(imports)
+    print(f"make-pdfs --help : {wall:7.1f} ms wall, median of {args.runs} (budget {args.budget_ms:.0f} ms)")
+    print(f"cli.make_pdfs    : {imp:7.1f} ms cumulative import")
+
+    failed = False
+    if heavy:
+        print(f"❌ Heavy modules imported at startup: {', '.join(sorted(heavy))}")
+        failed = True
+    if wall > args.budget_ms:
+        print("❌ Startup wall-time budget exceeded")
+        failed = True
+    if not failed:
+        print("✅ Startup within budget")
+    sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import os
+import re
+import json
+import hashlib
+import zipfile
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Dict, List, Tuple, Iterable
+
+import requests
+from requests.adapters import HTTPAdapter
+
+try:
+    import fcntl
+except ImportError:  # Windows: no flock; partial downloads are then per process
+    fcntl = None
+
+# --------------------------------------------------------------------------------------
+# Config
+# --------------------------------------------------------------------------------------
+
+DEFAULT_CACHE_DIR = Path.home() / ".cache" / "clickup-pdf-generator" / "attachments"
+MAX_DOWNLOADS = 4
+CHUNK = 1 << 16
+RETRIES = 3  # attempts per file; each retry resumes from the partial download
+
+# --------------------------------------------------------------------------------------
+# Helpers
+# --------------------------------------------------------------------------------------
+
+def attachment_key(att: Dict) -> Optional[str]:
+    """Stable cache key of a ClickUp attachment: its id, else its URL."""
+    return att.get("id") or att.get("url")
+
+def attachment_name(att: Dict) -> str:
+    """File name of an attachment as uploaded (title), falling back to id + extension."""
+    name = (att.get("title") or "").strip()
+    if not name:
+        ext = att.get("extension")
+        name = f"{att.get('id') or 'attachment'}{'.' + ext if ext else ''}"
+    return name
+
+def _safe(s: str) -> str:
+    return re.sub(r"[^\w.\-]+", "_", s, flags=re.U)[:120] or "file"
+
+# --------------------------------------------------------------------------------------
+# Content-addressed cache
+# --------------------------------------------------------------------------------------
+
+class AttachmentCache:
+    """
+    Downloaded attachments stored once per content hash:
+      objects/<sha[:2]>/<sha256>   file contents
+      partial/<key>.part           interrupted downloads, resumed with a Range request
+      partial/<key>.lock           held (flock) while a process downloads key
+      index.json                   {"<attachment id or url>": {"sha256", "size", "name"}}
+    An attachment whose key is in the index (and whose object exists) is never
+    downloaded again, whichever task it appears on. Index writes are atomic
+    (tmp + replace) and merge with the file on disk, so concurrent runs can share
+    a cache directory.
+    """
+
+    def __init__(self, root: Optional[Path] = None):
+        self.root = Path(root or os.getenv("CLICKUP_ATTACHMENT_CACHE") or DEFAULT_CACHE_DIR)
+        self.index_path = self.root / "index.json"
+        self._lock = threading.Lock()
+
+    def _read(self) -> Dict[str, Dict]:
+        try:
+            with self.index_path.open("r", encoding="utf-8") as f:
+                data = json.load(f)
+            return data if isinstance(data, dict) else {}
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    def object_path(self, sha256: str) -> Path:
+        return self.root / "objects" / sha256[:2] / sha256
+
+    def partial_path(self, key: str) -> Path:
+        name = hashlib.sha1(key.encode('utf-8')).hexdigest()
+        if fcntl is None:
+            name += f".{os.getpid()}"
+        return self.root / "partial" / f"{name}.part"
+
+    @contextmanager
+    def locked(self, key: str):
+        """
+        Exclusive lock on key's download across processes sharing the cache, so
+        two runs never append to the same .part file. The lock file is never
+        moved or deleted (unlike the .part, which becomes the object).
+        """
+        lock = self.partial_path(key).with_suffix(".lock")
+        lock.parent.mkdir(parents=True, exist_ok=True)
+        with lock.open("a") as f:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+            yield  # closing the file releases the lock
+
+    def get(self, key: str) -> Optional[Path]:
+        """Cached file for an attachment key, or None."""
+        with self._lock:
+            entry = self._read().get(key)
+        if entry:
+            path = self.object_path(entry["sha256"])
+            if path.exists():
+                return path
+        return None
+
+    def add(self, key: str, part: Path, sha256: str, name: str) -> Path:
+        """Move a completed download into the object store and index it under key."""
+        obj = self.object_path(sha256)
+        obj.parent.mkdir(parents=True, exist_ok=True)
+        if obj.exists():
+            part.unlink()  # same content already cached under another key
+        else:
+            os.replace(part, obj)
+        with self._lock:
+            data = self._read()
+            data[key] = {"sha256": sha256, "size": obj.stat().st_size, "name": name}
+            tmp = self.index_path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+            with tmp.open("w", encoding="utf-8") as f:
+                json.dump(data, f, indent=2)
+            os.replace(tmp, self.index_path)
+        return obj
+
+# --------------------------------------------------------------------------------------
+# Download
+# --------------------------------------------------------------------------------------
+
+def _download(session: requests.Session, url: str, part: Path) -> str:
+    """
+    Download url into part, resuming from its current size; returns the sha256.
+    Servers that ignore Range (200 instead of 206) restart the file from scratch.
+    """
+    part.parent.mkdir(parents=True, exist_ok=True)
+    h = hashlib.sha256()
+    have = part.stat().st_size if part.exists() else 0
+    headers = {"Range": f"bytes={have}-"} if have else {}
+    with session.get(url, headers=headers, stream=True, timeout=60) as r:
+        if r.status_code == 416 and have:
+            pass  # nothing left to fetch; the partial file is complete
+        elif r.status_code in (200, 206):
+            resume = r.status_code == 206
+            with part.open("ab" if resume else "wb") as f:
+                for chunk in r.iter_content(CHUNK):
+                    f.write(chunk)
+        else:
+            raise RuntimeError(f"Failed to download {url}. HTTP {r.status_code}")
+    with part.open("rb") as f:
+        for chunk in iter(lambda: f.read(CHUNK), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+def fetch_attachment(att: Dict, cache: AttachmentCache, session: requests.Session) -> Path:
+    """Local path of an attachment, downloading it (with resume and retries) unless cached."""
+    key = attachment_key(att)
+    url = att.get("url")
+    if not key or not url:
+        raise RuntimeError(f"Attachment {attachment_name(att)!r} has no URL")
+    cached = cache.get(key)
+    if cached:
+        return cached
+    with cache.locked(key):
+        cached = cache.get(key)  # another process may have finished it while we waited
+        if cached:
+            return cached
+        part = cache.partial_path(key)
+        for attempt in range(RETRIES):
+            try:
+                sha = _download(session, url, part)
+                break
+            except requests.RequestException:
+                if attempt == RETRIES - 1:
+                    raise
+        return cache.add(key, part, sha, attachment_name(att))
+
+def fetch_attachments(
+    attachments: Iterable[Dict],
+    cache: AttachmentCache,
+    max_workers: int = MAX_DOWNLOADS,
+) -> Tuple[Dict[str, Path], List[str]]:
+    """
+    Fetch attachments concurrently (at most max_workers downloads at a time),
+    each distinct key once. Returns ({key: local path}, [error lines]).
+    Attachment URLs are pre-signed, so no ClickUp credentials are sent.
+    """
+    unique: Dict[str, Dict] = {}
+    for att in attachments:
+        key = attachment_key(att)
+        if key:
+            unique.setdefault(key, att)
+
+    files: Dict[str, Path] = {}
+    errors: List[str] = []
+    if not unique:
+        return files, errors
+    workers = max(1, min(max_workers, len(unique)))
+    with requests.Session() as session:
+        session.mount("https://", HTTPAdapter(pool_connections=workers, pool_maxsize=workers))
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = {pool.submit(fetch_attachment, att, cache, session): key for key, att in unique.items()}
+            for f, key in futures.items():
+                try:
+                    files[key] = f.result()
+                except Exception as e:
+                    errors.append(f"attachment {attachment_name(unique[key])} -> {e}")
+    return files, errors
+
+# --------------------------------------------------------------------------------------
+# Bundles
+# --------------------------------------------------------------------------------------
+
+def write_bundle(zip_path: Path, items: List[Tuple[str, Path]]) -> Path:
+    """Zip (name, local path) pairs; duplicate names get a numeric prefix."""
+    seen: Dict[str, int] = {}
+    tmp = zip_path.with_suffix(f".{os.getpid()}.tmp")
+    with zipfile.ZipFile(tmp, "w", zipfile.ZIP_DEFLATED) as z:
+        for name, path in items:
+            name = _safe(name)
+            n = seen[name] = seen.get(name, 0) + 1
+            z.write(path, name if n == 1 else f"{n}_{name}")
+    os.replace(tmp, zip_path)
+    return zip_path
@@ -1,12 +1,12 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
-import os
 import re
 import json
 import argparse
 import requests
-from dotenv import load_dotenv
+
+from oauth.token_manager import ensure_api_key
 
 # --------------------------------------------------------------------------------------
 # Helpers
@@ -36,13 +36,6 @@ def is_custom_id(task_key: str) -> bool:
     """
     return not task_key.isdigit()
 
-def ensure_api_key(cli_key: str | None) -> str:
-    load_dotenv()
-    api = cli_key or os.getenv("CLICKUP_API_KEY")
-    if not api:
-        raise ValueError("Missing API key. Provide via --api-key or CLICKUP_API_KEY in .env")
-    return api
-
 # --------------------------------------------------------------------------------------
 # Main
 # --------------------------------------------------------------------------------------
@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Output layout and artifact index for make-pdfs.
+
+- Layouts shard the outputs directory so no single directory grows to
+  six-figure file counts (flat keeps the historical single directory).
+- ArchiveIndex is a SQLite database (<outputs>/index.sqlite) of every
+  generated artifact. It hands out sequence numbers, so nothing has to list
+  directories, and answers `make-pdfs find <key>` via indexed lookups.
+"""
+
+import os
+import re
+import json
+import sqlite3
+import hashlib
+import argparse
+from datetime import datetime, timezone
+from pathlib import Path
+from urllib.parse import quote
+from typing import Callable, Dict, Iterator, List, Optional
+
+from cli.make_pdfs import LAYOUTS
+
+# --------------------------------------------------------------------------------------
+# Layouts
+# --------------------------------------------------------------------------------------
+
+INDEX_NAME = "index.sqlite"
+
+def _part(value, fallback: str) -> str:
+    s = re.sub(r"[^\w\-]+", "_", str(value or ""), flags=re.U).strip("_")
+    return s[:60] or fallback
+
+def shard_dir(layout: str, task_key: str, task: Dict, now: Optional[datetime] = None) -> Path:
+    """
+    Sub-directory (relative to the outputs dir) for a task's files:
+      flat -> .            team -> <team_id>/      list -> <list_id>/
+      date -> YYYY/MM/     hash -> ab/cd/ (sha1 of the task key; 65536 buckets)
+    """
+    if layout == "flat":
+        return Path()
+    if layout == "team":
+        return Path(_part(task.get("team_id"), "no-team"))
+    if layout == "list":
+        return Path(_part((task.get("list") or {}).get("id"), "no-list"))
+    if layout == "date":
+        now = now or datetime.now(timezone.utc)
+        return Path(f"{now:%Y}", f"{now:%m}")
+    if layout == "hash":
+        h = hashlib.sha1(task_key.encode("utf-8")).hexdigest()
+        return Path(h[:2], h[2:4])
+    raise ValueError(f"Unknown layout {layout!r}. Choose from: {', '.join(LAYOUTS)}")
+
+class RelativeLinks:
+    """
+    task key -> href of its output, relative to one output's directory.
+    Computed on lookup, so a batch of n sharded tasks costs O(n) rather than
+    O(n^2) relpath calls. Quacks like the dict renderers expect (get()).
+    """
+
+    def __init__(self, targets: Dict[str, Path], start: Path):
+        self.targets = targets
+        self.start = start
+
+    def get(self, key: str, default=None):
+        target = self.targets.get(key)
+        if target is None:
+            return default
+        return quote(os.path.relpath(target, self.start).replace(os.sep, "/"))
+
+# --------------------------------------------------------------------------------------
+# Index
+# --------------------------------------------------------------------------------------
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS artifacts (
+    id          INTEGER PRIMARY KEY,
+    seq         INTEGER NOT NULL,
+    task_key    TEXT NOT NULL,
+    task_id     TEXT,
+    custom_id   TEXT,
+    team_id     TEXT,
+    list_id     TEXT,
+    format      TEXT NOT NULL,
+    path        TEXT NOT NULL UNIQUE,   -- relative to the outputs dir
+    json_path   TEXT,
+    sha256      TEXT,
+    json_sha256 TEXT,
+    bytes       INTEGER,
+    pages       INTEGER,
+    task_updated TEXT,                  -- ClickUp date_updated (epoch ms)
+    created_at  TEXT NOT NULL           -- ISO 8601, UTC
+);
+CREATE INDEX IF NOT EXISTS artifacts_task_key ON artifacts(task_key);
+CREATE INDEX IF NOT EXISTS artifacts_task_id ON artifacts(task_id);
+CREATE INDEX IF NOT EXISTS artifacts_custom_id ON artifacts(custom_id);
+CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value INTEGER NOT NULL);
+"""
+
+def file_digest(path: Path) -> Dict:
+    """sha256, size and (for PDFs) page count of a file."""
+    from pdf_generator.optimize import count_pages
+
+    data = path.read_bytes()
+    pages = count_pages(data) if path.suffix.lower() == ".pdf" else None
+    return {"sha256": hashlib.sha256(data).hexdigest(), "bytes": len(data), "pages": pages}
+
+class ArchiveIndex:
+    """
+    SQLite index of generated artifacts in an outputs directory.
+    WAL mode and a busy timeout let several make-pdfs runs share it; sequence
+    numbers are reserved in a write transaction, so concurrent runs never hand
+    out the same number.
+    """
+
+    def __init__(self, outdir: Path):
+        self.outdir = Path(outdir)
+        self.path = self.outdir / INDEX_NAME
+        self.outdir.mkdir(parents=True, exist_ok=True)
+        self.db = sqlite3.connect(str(self.path), timeout=30, isolation_level=None)
+        self.db.row_factory = sqlite3.Row
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.executescript(SCHEMA)
+
+    def close(self):
+        self.db.close()
+
+    def reserve(self, count: int, seed: Callable[[], int]) -> int:
+        """
+        Reserve count consecutive sequence numbers and return the first.
+        seed() gives the first free number for a directory that predates the
+        index (e.g. next_sequence over a flat outputs dir); it runs only once.
+        """
+        self.db.execute("BEGIN IMMEDIATE")
+        try:
+            row = self.db.execute("SELECT value FROM meta WHERE name = 'next_seq'").fetchone()
+            if row is None:
+                top = self.db.execute("SELECT MAX(seq) FROM artifacts").fetchone()[0] or 0
+                first = max(seed(), top + 1)
+            else:
+                first = row[0]
+            self.db.execute(
+                "INSERT INTO meta (name, value) VALUES ('next_seq', ?) "
+                "ON CONFLICT(name) DO UPDATE SET value = excluded.value",
+                (first + count,),
+            )
+            self.db.execute("COMMIT")
+        except BaseException:
+            self.db.execute("ROLLBACK")
+            raise
+        return first
+
+    def record(self, seq: int, task_key: str, task: Dict, fmt: str, out_path: Path, json_path: Optional[Path] = None):
+        """Index one rendered output (and the JSON written beside it)."""
+        out = file_digest(out_path)
+        js = file_digest(json_path) if json_path else {}
+        self.db.execute(
+            "INSERT OR REPLACE INTO artifacts (seq, task_key, task_id, custom_id, team_id, list_id, format, path, "
+            "json_path, sha256, json_sha256, bytes, pages, task_updated, created_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                seq, task_key, task.get("id"), task.get("custom_id"), task.get("team_id"),
+                (task.get("list") or {}).get("id"), fmt, self._rel(out_path),
+                self._rel(json_path) if json_path else None,
+                out["sha256"], js.get("sha256"), out["bytes"], out["pages"],
+                task.get("date_updated"), datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            ),
+        )
+
+    def find(self, key: str, fmt: Optional[str] = None, latest: bool = True) -> List[sqlite3.Row]:
+        """Artifacts of a task by task key, id or custom id, newest first."""
+        sql = "SELECT * FROM artifacts WHERE (task_key = :k OR task_id = :k OR custom_id = :k)"
+        if fmt:
+            sql += " AND format = :f"
+        sql += " ORDER BY seq DESC, id DESC"
+        if latest:
+            sql += " LIMIT 1"
+        return self.db.execute(sql, {"k": key, "f": fmt}).fetchall()
+
+    def _rel(self, p: Path) -> str:
+        return Path(p).resolve().relative_to(self.outdir.resolve()).as_posix()
+
+    def reindex(self, name_re: re.Pattern, formats) -> int:
+        """
+        Index existing '<NNNN> - <stem>.json' pairs under the outputs dir (e.g.
+        a flat directory from before the index existed). Returns rows added.
+        """
+        added = 0
+        self.db.execute("BEGIN")
+        for json_path in _walk(self.outdir):
+            m = name_re.match(json_path.name)
+            if not m or m.group(3).lower() != "json":
+                continue
+            try:
+                with json_path.open("r", encoding="utf-8") as f:
+                    task = json.load(f)
+            except (OSError, json.JSONDecodeError):
+                continue
+            key = task.get("custom_id") or task.get("id") or m.group(2).split("__")[0]
+            for fmt in formats:
+                out = json_path.with_suffix(f".{fmt}")
+                if out.exists() and not self.db.execute(
+                    "SELECT 1 FROM artifacts WHERE path = ?", (self._rel(out),)
+                ).fetchone():
+                    self.record(int(m.group(1)), key, task, fmt, out, json_path)
+                    added += 1
+        top = self.db.execute("SELECT MAX(seq) FROM artifacts").fetchone()[0] or 0
+        self.db.execute(
+            "INSERT INTO meta (name, value) VALUES ('next_seq', ?) "
+            "ON CONFLICT(name) DO UPDATE SET value = MAX(value, excluded.value)",
+            (top + 1,),
+        )
+        self.db.execute("COMMIT")
+        return added
+
+def _walk(root: Path) -> Iterator[Path]:
+    """Files under root (os.scandir, far cheaper than Path.rglob on big trees)."""
+    stack = [root]
+    while stack:
+        with os.scandir(stack.pop()) as it:
+            for e in it:
+                if e.is_dir(follow_symlinks=False):
+                    stack.append(Path(e.path))
+                elif e.name.endswith(".json"):
+                    yield Path(e.path)
+
+# --------------------------------------------------------------------------------------
+# CLI: make-pdfs find <key>
+# --------------------------------------------------------------------------------------
+
+def find_main(argv: Optional[List[str]] = None):
+    from cli.make_pdfs import NAME_RE, FORMATS, parse_identifier
+
+    ap = argparse.ArgumentParser(
+        prog="make-pdfs find",
+        description="Look up generated files for a task in the outputs index.",
+    )
+    ap.add_argument("key", nargs="?", help="Task URL, custom ID (e.g. PERSON-20340) or numeric task ID.")
+    ap.add_argument("--outputs", default="outputs", help="Output directory (default: outputs)")
+    ap.add_argument("--format", choices=FORMATS, default=None, help="Only this output format")
+    ap.add_argument("--all", action="store_true", help="List every version, not just the latest")
+    ap.add_argument("--json", action="store_true", help="Print rows as JSON")
+    ap.add_argument("--reindex", action="store_true", help="Index existing files first (for directories created before the index)")
+    args = ap.parse_args(argv)
+    if not args.key and not args.reindex:
+        ap.error("a task key is required (or use --reindex)")
+
+    outdir = Path(args.outputs).resolve()
+    if not outdir.is_dir():
+        raise SystemExit(f"No outputs directory at {outdir}")
+    index = ArchiveIndex(outdir)
+    try:
+        if args.reindex:
+            print(f"Indexed {index.reindex(NAME_RE, FORMATS)} existing file(s).")
+        if not args.key:
+            return
+        rows = index.find(parse_identifier(args.key)[1], args.format, latest=not args.all)
+    finally:
+        index.close()
+
+    if not rows:
+        raise SystemExit(f"No generated files for {args.key} in {outdir}")
+    if args.json:
+        print(json.dumps([dict(r) for r in rows], indent=2))
+        return
+    if not args.all:
+        print(outdir / rows[0]["path"])
+        return
+    for r in rows:
+        pages = f"{r['pages']}p" if r["pages"] is not None else "-"
+        print(f"{r['seq']:04d}  {r['created_at']}  {r['format']:4s} {pages:>5s}  {outdir / r['path']}")
+
+if __name__ == "__main__":
+    find_main()
@@ -0,0 +1,370 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Distributed batch mode: `make-pdfs produce` fetches task JSON into a spool
+directory, and any number of `make-pdfs work` processes, on this host or on
+others sharing the filesystem, render it.
+
+Spool layout (every state change is a single atomic rename, which is safe
+across processes and across hosts on one shared filesystem; SQLite locking
+is not reliable on network filesystems):
+  tmp/        envelopes being written by the producer
+  pending/    <seq>.json envelopes {"seq", "key", "raw", "base", "task"}
+  claimed/    <seq>.json@<host>-<pid>  claimed by a worker (mtime refreshed while it renders)
+  done/       rendered
+  failed/     <seq>.json plus <seq>.json.err
+  producer.done  written when the producer exits (all work queued, or it failed)
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import socket
+import argparse
+import itertools
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+STATES = ("tmp", "pending", "claimed", "done", "failed")
+PRODUCER_DONE = "producer.done"
+FETCH_CHUNK = 50
+SCAN_BATCH = 512
+STALE_AFTER = 600  # seconds before a claim whose worker died is put back
+REPORT_EVERY = 10.0
+
+# --------------------------------------------------------------------------------------
+# Spool
+# --------------------------------------------------------------------------------------
+
+class Spool:
+    """Directory work queue; see the module docstring for the layout."""
+
+    def __init__(self, root: Path):
+        self.root = Path(root)
+        for state in STATES:
+            (self.root / state).mkdir(parents=True, exist_ok=True)
+        self.worker_id = f"{socket.gethostname()}-{os.getpid()}"
+
+    def dir(self, state: str) -> Path:
+        return self.root / state
+
+    def put(self, seq: int, envelope: Dict):
+        """Durably enqueue one item: write + fsync in tmp/, then rename into pending/."""
+        name = f"{seq:08d}.json"
+        tmp = self.dir("tmp") / f"{name}@{self.worker_id}"
+        with tmp.open("w", encoding="utf-8") as f:
+            json.dump(envelope, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.dir("pending") / name)
+
+    def producer_done(self) -> bool:
+        return (self.root / PRODUCER_DONE).exists()
+
+    def mark_producer(self, done: bool):
+        marker = self.root / PRODUCER_DONE
+        if done:
+            marker.touch()
+        elif marker.exists():
+            marker.unlink()
+
+    def _candidates(self) -> List[str]:
+        # Read a bounded slice of pending/ and shuffle it so concurrent workers
+        # rarely race for the same file
+        with os.scandir(self.dir("pending")) as it:
+            names = [e.name for e in itertools.islice(it, SCAN_BATCH) if e.name.endswith(".json")]
+        random.shuffle(names)
+        return names
+
+    def claims(self) -> Iterator[Path]:
+        """
+        Claim pending items one at a time until pending/ is empty. A claim is
+        a rename into claimed/; losing the race to another worker is a
+        FileNotFoundError and just moves on to the next name.
+        """
+        while True:
+            names = self._candidates()
+            if not names:
+                return
+            for name in names:
+                claimed = self.dir("claimed") / f"{name}@{self.worker_id}"
+                try:
+                    os.rename(self.dir("pending") / name, claimed)
+                    os.utime(claimed)
+                except FileNotFoundError:
+                    continue  # taken by another worker (or requeued between rename and utime)
+                yield claimed
+
+    @contextmanager
+    def heartbeat(self, claimed: Path, interval: float):
+        """
+        Touch the claim every interval seconds while the block runs, so a
+        render that takes longer than --stale-after is not requeued under a
+        live worker.
+        """
+        stop = threading.Event()
+
+        def beat():
+            while not stop.wait(interval):
+                try:
+                    os.utime(claimed)
+                except FileNotFoundError:
+                    return
+
+        thread = threading.Thread(target=beat, name=f"heartbeat-{claimed.name}", daemon=True)
+        thread.start()
+        try:
+            yield
+        finally:
+            stop.set()
+            thread.join()
+
+    def finish(self, claimed: Path, error: Optional[str] = None):
+        name = claimed.name.split("@", 1)[0]
+        try:
+            if error is None:
+                os.replace(claimed, self.dir("done") / name)
+            else:
+                (self.dir("failed") / f"{name}.err").write_text(error, encoding="utf-8")
+                os.replace(claimed, self.dir("failed") / name)
+        except FileNotFoundError:
+            pass  # requeued as stale meanwhile; another worker renders it again
+
+    def requeue_stale(self, older_than: float) -> int:
+        """Put claims older than older_than seconds (dead workers) back into pending/."""
+        now = time.time()
+        moved = 0
+        with os.scandir(self.dir("claimed")) as it:
+            for e in it:
+                try:
+                    if now - e.stat().st_mtime < older_than:
+                        continue
+                    os.rename(e.path, self.dir("pending") / e.name.split("@", 1)[0])
+                    moved += 1
+                except FileNotFoundError:
+                    pass  # finished or requeued by someone else meanwhile
+        return moved
+
+    def counts(self) -> Dict[str, int]:
+        out = {}
+        for state in ("pending", "claimed", "done", "failed"):
+            with os.scandir(self.dir(state)) as it:
+                out[state] = sum(1 for e in it if e.name.endswith(".json") or state == "claimed")
+        return out
+
+# --------------------------------------------------------------------------------------
+# Producer
+# --------------------------------------------------------------------------------------
+
+def _read_identifiers(args) -> List[str]:
+    ids = list(args.identifiers or [])
+    if args.from_file:
+        f = sys.stdin if args.from_file == "-" else open(args.from_file, "r", encoding="utf-8")
+        with f:
+            ids += [ln.strip() for ln in f if ln.strip() and not ln.lstrip().startswith("#")]
+    return ids
+
+def produce_main(argv: Optional[List[str]] = None):
+    from cli.make_pdfs import MAX_IN_FLIGHT, LAYOUTS, fetch_all, choose_stem, next_sequence
+
+    ap = argparse.ArgumentParser(
+        prog="make-pdfs produce",
+        description="Fetch task JSON into a spool directory for `make-pdfs work` to render.",
+    )
+    ap.add_argument("identifiers", nargs="*", help="Task URLs, custom IDs or numeric task IDs.")
+    ap.add_argument("--from-file", help="Read identifiers from a file, one per line ('-' for stdin).")
+    ap.add_argument("--spool", required=True, help="Spool directory shared with the workers.")
+    ap.add_argument("--outputs", default="outputs", help="Output directory, used for sequence numbers (default: outputs)")
+    ap.add_argument("--layout", choices=LAYOUTS, default="flat", help="Directory layout under --outputs (default: flat)")
+    ap.add_argument("--team", help="Team ID (optional if using URL or CLICKUP_TEAM_ID is set in .env).")
+    ap.add_argument("--api-key", dest="api_key", default=None, help="Override CLICKUP_API_KEY from environment/.env")
+    ap.add_argument("--no-markdown", action="store_true", help="Do NOT include markdown_description")
+    ap.add_argument("--with-comments", action="store_true", help="Also fetch comment threads and status history")
+    ap.add_argument("--max-in-flight", type=int, default=MAX_IN_FLIGHT,
+                    help=f"Max concurrent comment/reply requests per task (default: {MAX_IN_FLIGHT})")
+    ap.add_argument("--chunk", type=int, default=FETCH_CHUNK,
+                    help=f"Identifiers fetched per round; workers start on the first round (default: {FETCH_CHUNK})")
+    args = ap.parse_args(argv)
+
+    identifiers = _read_identifiers(args)
+    if not identifiers:
+        ap.error("no identifiers given (pass them as arguments or with --from-file)")
+    # Clear a marker left by an earlier run before anything else, or waiting
+    # workers would exit early; set it however this run ends so they never hang
+    spool = Spool(Path(args.spool))
+    spool.mark_producer(False)
+    try:
+        from dotenv import load_dotenv
+        from oauth.token_manager import TokenManager
+        from cli.archive import ArchiveIndex, shard_dir
+        load_dotenv()
+
+        manager = TokenManager.from_env(args.api_key)
+        if not manager.has_credentials():
+            raise SystemExit("Missing API key. Provide --api-key, set CLICKUP_API_KEY in .env, or authorize a team via OAuth")
+        outdir = Path(args.outputs).resolve()
+        index = ArchiveIndex(outdir)
+
+        queued, errors = 0, []
+        t0 = time.perf_counter()
+        for start in range(0, len(identifiers), max(1, args.chunk)):
+            fetched = fetch_all(
+                identifiers[start:start + args.chunk], args.team, manager, include_md=(not args.no_markdown),
+                with_comments=args.with_comments, max_in_flight=args.max_in_flight,
+            )
+            ok = [(raw, key, task) for raw, key, task, err in fetched if err is None]
+            errors.extend(f"{raw} -> {err}" for raw, _, _, err in fetched if err is not None)
+            seq = index.reserve(len(ok), seed=lambda: next_sequence(outdir))
+            for raw, key, task in ok:
+                base = shard_dir(args.layout, key, task) / f"{seq:04d} - {choose_stem(key, task)}"
+                spool.put(seq, {"seq": seq, "key": key, "raw": raw, "base": base.as_posix(), "task": task})
+                queued += 1
+                seq += 1
+            secs = time.perf_counter() - t0
+            print(f"queued {queued}/{len(identifiers)} ({queued / secs:.1f} tasks/s)", flush=True)
+        manager.close()
+        index.close()
+    finally:
+        spool.mark_producer(True)
+
+    print(f"✅ Queued {queued} task(s) in {spool.dir('pending')}")
+    if errors:
+        print("\n⚠️ Some items failed:")
+        for line in errors:
+            print(f"  - {line}")
+
+# --------------------------------------------------------------------------------------
+# Workers
+# --------------------------------------------------------------------------------------
+
+def work_loop(
+    spool_dir: str,
+    outputs: str,
+    use_index: bool,
+    wait: bool,
+    optimize: bool = False,
+    stale_after: float = STALE_AFTER,
+    report_every: float = REPORT_EVERY,
+) -> Dict:
+    """
+    Claim and render items until the spool is drained (and, with wait, the
+    producer has finished). Claims are touched every stale_after / 3 seconds
+    while rendering; whenever pending/ runs dry, claims idle for stale_after
+    (dead workers) are requeued and picked up. Returns this worker's
+    throughput stats.
+    """
+    from cli.make_pdfs import render_pdf
+    from cli.archive import ArchiveIndex
+    from pdf_generator.optimize import optimize_file
+
+    spool = Spool(Path(spool_dir))
+    outdir = Path(outputs).resolve()
+    index = ArchiveIndex(outdir) if use_index else None
+    stats = {"worker": spool.worker_id, "done": 0, "failed": 0, "bytes": 0, "raw_bytes": 0, "seconds": 0.0}
+    t0 = last = time.perf_counter()
+
+    while True:
+        # Read before the pass: items queued after an empty pass but before a
+        # fresh producer.done would otherwise be left behind by every worker
+        finished = not wait or spool.producer_done()
+        for claimed in spool.claims():
+            try:
+                with claimed.open("r", encoding="utf-8") as f:
+                    item = json.load(f)
+                task = item["task"]
+                json_path = outdir / f"{item['base']}.json"
+                pdf_path = outdir / f"{item['base']}.pdf"
+                json_path.parent.mkdir(parents=True, exist_ok=True)
+                with open(json_path, "w", encoding="utf-8") as f:
+                    json.dump(task, f, indent=2)
+                with spool.heartbeat(claimed, stale_after / 3):
+                    render_pdf(task, pdf_path)
+                    before = pdf_path.stat().st_size
+                    if optimize:
+                        before, _ = optimize_file(pdf_path)
+                    if index is not None:
+                        index.record(item["seq"], item["key"], task, "pdf", pdf_path, json_path)
+                spool.finish(claimed)
+                stats["done"] += 1
+                stats["bytes"] += pdf_path.stat().st_size
+                stats["raw_bytes"] += before
+            except Exception as e:
+                spool.finish(claimed, f"{type(e).__name__}: {e}")
+                stats["failed"] += 1
+            now = time.perf_counter()
+            if now - last >= report_every:
+                last = now
+                print(f"[{spool.worker_id}] {stats['done']} done, {stats['done'] / (now - t0):.2f} tasks/s", flush=True)
+        requeued = spool.requeue_stale(stale_after)
+        if requeued:
+            print(f"[{spool.worker_id}] requeued {requeued} stale claim(s)", flush=True)
+            continue
+        if finished:
+            break
+        time.sleep(0.5)
+
+    if index is not None:
+        index.close()
+    stats["seconds"] = time.perf_counter() - t0
+    return stats
+
+def _fmt_stats(s: Dict) -> str:
+    secs = max(s["seconds"], 1e-9)
+    return (f"{s['done']:6d} done {s['failed']:4d} failed  {s['seconds']:8.1f} s  "
+            f"{s['done'] / secs:7.2f} tasks/s  {s['bytes'] / 2**20 / secs:6.2f} MB/s")
+
+def work_main(argv: Optional[List[str]] = None):
+    ap = argparse.ArgumentParser(
+        prog="make-pdfs work",
+        description="Render tasks queued by `make-pdfs produce`. Run it on as many hosts as share the spool.",
+    )
+    ap.add_argument("--spool", required=True, help="Spool directory shared with the producer.")
+    ap.add_argument("--outputs", default="outputs", help="Output directory (default: outputs)")
+    ap.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                    help="Render processes on this host (default: number of CPUs)")
+    ap.add_argument("--no-wait", action="store_true",
+                    help="Exit as soon as the queue is empty instead of waiting for the producer to finish")
+    ap.add_argument("--no-index", action="store_true",
+                    help="Do not write outputs/index.sqlite (for hosts sharing the outputs over a network "
+                         "filesystem; run `make-pdfs find --reindex` afterwards)")
+    ap.add_argument("--optimize", action="store_true",
+                    help="Shrink each PDF after rendering (see make-pdfs --optimize)")
+    ap.add_argument("--stale-after", type=float, default=STALE_AFTER,
+                    help=f"Requeue claims older than this many seconds, left by dead workers (default: {STALE_AFTER})")
+    args = ap.parse_args(argv)
+
+    spool = Spool(Path(args.spool))
+    requeued = spool.requeue_stale(args.stale_after)
+    if requeued:
+        print(f"Requeued {requeued} stale claim(s).")
+
+    job = (str(spool.root), args.outputs, not args.no_index, not args.no_wait, args.optimize, args.stale_after)
+    t0 = time.perf_counter()
+    if args.workers <= 1:
+        results = [work_loop(*job)]
+    else:
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(max_workers=args.workers) as pool:
+            results = list(pool.map(work_loop, *zip(*[job] * args.workers)))
+    wall = time.perf_counter() - t0
+
+    print("\nWorker throughput:")
+    for s in results:
+        print(f"  {s['worker']:24s} {_fmt_stats(s)}")
+    total = {
+        "done": sum(s["done"] for s in results), "failed": sum(s["failed"] for s in results),
+        "bytes": sum(s["bytes"] for s in results), "seconds": wall,
+    }
+    print(f"  {'total (wall)':24s} {_fmt_stats(total)}")
+    raw = sum(s["raw_bytes"] for s in results)
+    if args.optimize and raw:
+        print(f"\n🗜 Optimized: {raw / 2**20:.2f} MB -> {total['bytes'] / 2**20:.2f} MB "
+              f"({100 * (1 - total['bytes'] / raw):.1f}% smaller)")
+    counts = spool.counts()
+    print(f"\n📂 Spool: {counts['pending']} pending, {counts['claimed']} claimed, "
+          f"{counts['done']} done, {counts['failed']} failed")
@@ -3,22 +3,17 @@
 
 import os
 import re
+import sys
 import json
 import argparse
 from pathlib import Path
-from typing import Optional, Tuple, List, Dict
-
-from dotenv import load_dotenv
-import requests
-
-# PDF bits (reuse your renderer)
-from reportlab.lib.pagesizes import A4
-from reportlab.lib.units import mm
-from reportlab.platypus import SimpleDocTemplate
-
-# --- FIXED PROJECT IMPORTS ---
-from pdf_generator.renderers import build_story
+from typing import TYPE_CHECKING, Optional, Tuple, List, Dict
 
+# Heavy dependencies (requests, dotenv, ReportLab) are imported inside the stage
+# that needs them so `--help`, argument errors and no-op runs start instantly.
+if TYPE_CHECKING:
+    import requests
+    from oauth.token_manager import TokenManager
 
 # --------------------------------------------------------------------------------------
 # Parsing & API helpers
@@ -44,25 +39,101 @@ def is_custom_id(task_key: str) -> bool:
     # Pure digits => task_id, else assume custom_id
     return not task_key.isdigit()
 
-def ensure_api_key(cli_key: Optional[str]) -> str:
-    api = cli_key or os.getenv("CLICKUP_API_KEY")
-    if not api:
-        raise SystemExit("Missing API key. Provide --api-key or set CLICKUP_API_KEY in .env")
-    return api
-
 def resolve_team_id(url_team: Optional[str], cli_team: Optional[str]) -> Optional[str]:
     """
     Priority: URL > --team > CLICKUP_TEAM_ID (from .env)
     """
     return url_team or cli_team or os.getenv("CLICKUP_TEAM_ID")
 
-def fetch_task(task_key: str, team_id: Optional[str], api_key: str, include_md: bool = True) -> Dict:
+API_BASE = "https://api.clickup.com/api/v2"
+COMMENT_PAGE_SIZE = 25  # ClickUp returns at most 25 comments per page
+MAX_IN_FLIGHT = 8
+MAX_DOWNLOADS = 4
+
+def _get_json(session, url: str, headers: Dict, params: Dict, what: str) -> Dict:
+    r = session.get(url, headers=headers, params=params, timeout=30)
+    if r.status_code != 200:
+        raise RuntimeError(f"Failed to fetch {what}. HTTP {r.status_code} - {r.text}")
+    return r.json()
+
+def _slim_comment(c: Dict) -> Dict:
+    """Keep only what the renderer needs; raw comments carry a lot of unused metadata."""
+    return {
+        "id": c.get("id"),
+        "user": (c.get("user") or {}).get("username"),
+        "date": c.get("date"),
+        "comment": c.get("comment") or [],
+    }
+
+def fetch_comments(
+    task_key: str,
+    params: Dict,
+    headers: Dict,
+    session,
+    max_in_flight: int = MAX_IN_FLIGHT,
+) -> List[Dict]:
+    """
+    Fetch all comments of a task (oldest first) with their threaded replies.
+    - Comment pages are cursor-paged (start/start_id of the oldest comment seen),
+      so they are walked sequentially; reply threads are fetched concurrently
+      while paging continues, with at most max_in_flight requests running.
+    - Pending reply fetches are capped too, so memory stays bounded on tasks
+      with thousands of comments.
+    """
+    from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+    comments: List[Dict] = []
+    pending: Dict = {}
+
+    def fetch_replies(comment_id: str) -> List[Dict]:
+        data = _get_json(session, f"{API_BASE}/comment/{comment_id}/reply", headers, {}, f"replies of comment {comment_id}")
+        return [_slim_comment(r) for r in data.get("comments") or []]
+
+    def drain(limit: int):
+        while len(pending) > limit:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for f in done:
+                pending.pop(f)["replies"] = f.result()
+
+    with ThreadPoolExecutor(max_workers=max(1, max_in_flight)) as pool:
+        page_params = dict(params)
+        while True:
+            data = _get_json(session, f"{API_BASE}/task/{task_key}/comment", headers, page_params, f"comments of {task_key}")
+            page = data.get("comments") or []
+            for c in page:
+                slim = _slim_comment(c)
+                comments.append(slim)
+                if int(c.get("reply_count") or 0) > 0:
+                    drain(2 * max_in_flight)
+                    pending[pool.submit(fetch_replies, c["id"])] = slim
+            if len(page) < COMMENT_PAGE_SIZE:
+                break
+            oldest = page[-1]
+            page_params["start"] = oldest.get("date")
+            page_params["start_id"] = oldest.get("id")
+        drain(0)
+
+    # Pages come newest first
+    comments.reverse()
+    return comments
+
+def fetch_task(
+    task_key: str,
+    team_id: Optional[str],
+    api_key: Optional[str] = None,
+    include_md: bool = True,
+    session: Optional["requests.Session"] = None,
+    with_comments: bool = False,
+    max_in_flight: int = MAX_IN_FLIGHT,
+) -> Dict:
     """
     Fetch task JSON from ClickUp.
     - If task_key is custom ID -> requires team_id (unless embedded in URL or in env).
     - If task_key is numeric -> team_id ignored.
+    - With a session (see TokenManager.session) auth comes from the session, else api_key.
+    - with_comments adds task["comments"] (threaded) and task["status_history"].
     """
-    headers = {"Authorization": api_key}
+    headers = {"Authorization": api_key} if api_key else {}
     params = {}
     if is_custom_id(task_key):
         if not team_id:
@@ -73,20 +144,74 @@ def fetch_task(task_key: str, team_id: Optional[str], api_key: str, include_md:
         params["custom_task_ids"] = "true"
         params["team_id"] = str(team_id)
 
+    id_params = dict(params)
     if include_md:
         params["include_markdown_description"] = "true"
 
-    url = f"https://api.clickup.com/api/v2/task/{task_key}"
-    r = requests.get(url, headers=headers, params=params, timeout=30)
-    if r.status_code != 200:
-        raise RuntimeError(f"Failed to fetch task {task_key}. HTTP {r.status_code} - {r.text}")
-    return r.json()
+    if session is None:
+        import requests
+        session = requests
+    task = _get_json(session, f"{API_BASE}/task/{task_key}", headers, params, f"task {task_key}")
+
+    if with_comments:
+        task["comments"] = fetch_comments(task_key, id_params, headers, session, max_in_flight)
+        history = _get_json(session, f"{API_BASE}/task/{task_key}/time_in_status", headers, id_params, f"status history of {task_key}")
+        task["status_history"] = history.get("status_history") or []
+    return task
+
+def fetch_all(
+    identifiers: List[str],
+    cli_team: Optional[str],
+    manager: "TokenManager",
+    include_md: bool = True,
+    with_comments: bool = False,
+    max_in_flight: int = MAX_IN_FLIGHT,
+) -> List[Tuple[str, str, Optional[Dict], Optional[Exception]]]:
+    """
+    Fetch every identifier, returning (raw, key, task, error) in input order.
+    Identifiers are grouped by team; teams run concurrently, each on its own
+    pooled session (and thus its own token and rate-limit budget), while tasks
+    within one team are fetched sequentially.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    groups: Dict[Optional[str], List[int]] = {}
+    parsed: List[Tuple[str, Optional[str], str]] = []
+    for i, raw in enumerate(identifiers):
+        url_team, key = parse_identifier(raw)
+        team_id = resolve_team_id(url_team, cli_team)
+        parsed.append((raw, team_id, key))
+        groups.setdefault(team_id, []).append(i)
+
+    out: List[Tuple[str, str, Optional[Dict], Optional[Exception]]] = [None] * len(parsed)
+
+    def run_team(team_id: Optional[str], indices: List[int]):
+        session = manager.session(team_id)
+        for i in indices:
+            raw, _, key = parsed[i]
+            try:
+                task = fetch_task(
+                    key, team_id, include_md=include_md, session=session,
+                    with_comments=with_comments, max_in_flight=max_in_flight,
+                )
+                out[i] = (raw, key, task, None)
+            except Exception as e:
+                out[i] = (raw, key, None, e)
+
+    with ThreadPoolExecutor(max_workers=max(1, len(groups))) as pool:
+        for f in [pool.submit(run_team, t, idx) for t, idx in groups.items()]:
+            f.result()
+    return out
 
 # --------------------------------------------------------------------------------------
 # Naming, sequencing, and I/O
 # --------------------------------------------------------------------------------------
 
-NAME_RE = re.compile(r"^(\d{4})\s*-\s*(.+)\.(json|pdf)$", re.I)
+NAME_RE = re.compile(r"^(\d{4,})\s*-\s*(.+)\.(json|pdf|html|md)$", re.I)
+FORMATS = ("pdf", "html", "md")  # keys of pdf_generator.backends.BACKENDS
+ATTACHMENT_MODES = ("link", "embed", "bundle")
+# Defined here rather than in cli.archive (which imports sqlite3) to keep startup light
+LAYOUTS = ("flat", "team", "list", "date", "hash")  # see cli.archive.shard_dir
 
 def next_sequence(outputs_dir: Path) -> int:
     """
@@ -119,29 +244,61 @@ def choose_stem(task_key: str, task: Dict) -> str:
     stem = f"{task_key}__{short}" if short else task_key
     return sanitize_basename(stem)
 
+def render_output(
+    task: Dict,
+    out_path: Path,
+    fmt: str = "pdf",
+    local_links: Optional[Dict[str, str]] = None,
+    attachments: Optional[Dict[str, Path]] = None,
+    bundle: Optional[str] = None,
+    optimize: bool = False,
+    embed_fonts: Optional[str] = None,
+) -> Optional[Tuple[int, int]]:
+    """
+    Render a task with the chosen output backend (pdf, html or md).
+    local_links: task id/custom id -> relative href of sibling outputs to link to.
+    attachments: attachment id -> local file to embed; {} lists attachments as links.
+    bundle: name of the attachments zip written next to the output.
+    optimize: run the PDF size pass (pdf_generator.optimize); returns (bytes before, after).
+    embed_fonts: embed a TrueType family as subsets (directory, '' to search the system).
+    """
+    from pdf_generator.backends import get_backend
+    from pdf_generator.renderers import iter_document
+
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    blocks = iter_document(task, local_links, attachments, bundle)
+    get_backend(fmt, embed_fonts=embed_fonts).write(blocks, out_path, title=task.get('name') or 'ClickUp PDF')
+    if optimize and fmt == "pdf":
+        from pdf_generator.optimize import optimize_file
+        return optimize_file(out_path)
+    return None
+
 def render_pdf(task: Dict, pdf_path: Path):
-    pdf_path.parent.mkdir(parents=True, exist_ok=True)
-    doc = SimpleDocTemplate(
-        str(pdf_path),
-        pagesize=A4,
-        leftMargin=18*mm, rightMargin=18*mm,
-        topMargin=16*mm, bottomMargin=16*mm,
-        title=task.get('name') or 'ClickUp PDF',
-        author="clickup-pdf-generator",
-    )
-    story = build_story(task)
-    doc.build(story)
+    render_output(task, pdf_path, "pdf")
 
 # --------------------------------------------------------------------------------------
 # CLI
 # --------------------------------------------------------------------------------------
 
+# subcommand -> "module:function" taking argv; anything else is a list of identifiers
+SUBCOMMANDS = {
+    "find": "cli.archive:find_main",
+    "produce": "cli.batch:produce_main",
+    "work": "cli.batch:work_main",
+}
+
 def main():
-    # Load .env up-front so both API key and CLICKUP_TEAM_ID are available
-    load_dotenv()
+    argv = sys.argv[1:]
+    if argv[:1] and argv[0] in SUBCOMMANDS:
+        from importlib import import_module
+        module, func = SUBCOMMANDS[argv[0]].split(":")
+        return getattr(import_module(module), func)(argv[1:])
 
     ap = argparse.ArgumentParser(
-        description="Fetch one or more ClickUp tasks and emit paired JSON/PDF files into ./outputs with persistent sequencing."
+        description="Fetch one or more ClickUp tasks and emit paired JSON/PDF files into ./outputs with persistent sequencing.",
+        epilog="Subcommands: 'make-pdfs find <key>' looks up the files generated for a task; "
+               "'make-pdfs produce' and 'make-pdfs work' split a large run into a fetching producer "
+               "and rendering workers (see --help of each).",
     )
     ap.add_argument(
         "identifiers", nargs="+",
@@ -162,49 +319,162 @@ def main():
         "--no-markdown", action="store_true",
         help="Do NOT include markdown_description"
     )
-    args = ap.parse_args()
+    ap.add_argument(
+        "--with-comments", action="store_true",
+        help="Also fetch comment threads and status history and render them"
+    )
+    ap.add_argument(
+        "--max-in-flight", type=int, default=MAX_IN_FLIGHT,
+        help=f"Max concurrent comment/reply requests per task (default: {MAX_IN_FLIGHT})"
+    )
+    ap.add_argument(
+        "--format", choices=FORMATS, default="pdf",
+        help="Output format written next to each JSON (default: pdf)"
+    )
+    ap.add_argument(
+        "--attachments", choices=ATTACHMENT_MODES, default=None,
+        help="Include task attachments: link to them, embed them in the PDF, "
+             "or bundle them as '<NNNN - stem>.attachments.zip' next to the output"
+    )
+    ap.add_argument(
+        "--attachment-cache", default=None,
+        help="Content-addressed download cache (default: CLICKUP_ATTACHMENT_CACHE or ~/.cache/clickup-pdf-generator/attachments)"
+    )
+    ap.add_argument(
+        "--max-downloads", type=int, default=MAX_DOWNLOADS,
+        help=f"Max concurrent attachment downloads (default: {MAX_DOWNLOADS})"
+    )
+    ap.add_argument(
+        "--layout", choices=LAYOUTS, default="flat",
+        help="Directory layout under --outputs: flat, or sharded by team, list, date (YYYY/MM) "
+             "or hash prefix (default: flat)"
+    )
+    ap.add_argument(
+        "--optimize", action="store_true",
+        help="Shrink PDFs after rendering (binary Flate streams, deduplicated images/fonts/files) "
+             "and report bytes before/after"
+    )
+    ap.add_argument(
+        "--embed-fonts", nargs="?", const="", default=None, metavar="FONT_DIR",
+        help="Embed subsetted TrueType fonts (DejaVuSans) instead of built-in Helvetica, as PDF/A "
+             "requires; searches system font directories unless FONT_DIR is given"
+    )
+    args = ap.parse_args(argv)
+    if args.attachments == "embed" and args.format != "pdf":
+        ap.error("--attachments embed requires --format pdf (use bundle for other formats)")
+    if (args.optimize or args.embed_fonts is not None) and args.format != "pdf":
+        ap.error("--optimize and --embed-fonts apply to --format pdf only")
+    if args.embed_fonts is not None:
+        # Check the font once, before fetching, instead of failing every render
+        from pdf_generator.styles import register_embedded_fonts
+        try:
+            register_embedded_fonts(args.embed_fonts or None)
+        except (FileNotFoundError, ValueError) as e:
+            raise SystemExit(str(e))
 
-    api_key = ensure_api_key(args.api_key)
+    # Load .env once arguments are valid so both API key and CLICKUP_TEAM_ID are available
+    from dotenv import load_dotenv
+    from oauth.token_manager import TokenManager
+    load_dotenv()
+
+    manager = TokenManager.from_env(args.api_key)
+    if not manager.has_credentials():
+        raise SystemExit("Missing API key. Provide --api-key, set CLICKUP_API_KEY in .env, or authorize a team via OAuth")
     outdir = Path(args.outputs).resolve()
     outdir.mkdir(parents=True, exist_ok=True)
 
-    seq = next_sequence(outdir)
-
-    results: List[Tuple[str, Path, Path]] = []
+    results: List[Tuple[str, Path, Path, List[Path]]] = []
     errors: List[str] = []
+    sizes: List[Tuple[int, int]] = []
 
-    for raw in args.identifiers:
+    fetched = fetch_all(
+        args.identifiers, args.team, manager, include_md=(not args.no_markdown),
+        with_comments=args.with_comments, max_in_flight=args.max_in_flight,
+    )
+    manager.close()
+
+    from cli.archive import ArchiveIndex, RelativeLinks, shard_dir
+    index = ArchiveIndex(outdir)
+    ok = [(raw, key, task) for raw, key, task, err in fetched if err is None]
+    errors.extend(f"{raw} -> {err}" for raw, _, _, err in fetched if err is not None)
+    # Sequence numbers come from the index, not from listing the (possibly huge) tree
+    seq = index.reserve(len(ok), seed=lambda: next_sequence(outdir))
+
+    # Name every output up front so tasks in this batch can link to each other locally
+    planned: List[Tuple[str, str, Dict, int, Path]] = []
+    targets: Dict[str, Path] = {}
+    for raw, key, task in ok:
+        base = shard_dir(args.layout, key, task) / f"{seq:04d} - {choose_stem(key, task)}"
+        planned.append((raw, key, task, seq, base))
+        seq += 1
+        for k in (key, task.get("id"), task.get("custom_id")):
+            if k:
+                targets[k] = outdir / f"{base}.{args.format}"
+
+    # Download attachments of the whole batch in one bounded pool; the cache
+    # skips anything an earlier task or run already fetched
+    files: Dict[str, Path] = {}
+    if args.attachments in ("embed", "bundle"):
+        from api.attachments import AttachmentCache, fetch_attachments
+        cache = AttachmentCache(args.attachment_cache)
+        every = [a for _, _, task, _, _ in planned for a in task.get("attachments") or []]
+        files, failed = fetch_attachments(every, cache, args.max_downloads)
+        errors.extend(failed)
+
+    for raw, key, task, task_seq, base in planned:
         try:
-            url_team, key = parse_identifier(raw)
-            team_id = resolve_team_id(url_team, args.team)
-
-            task = fetch_task(key, team_id, api_key, include_md=(not args.no_markdown))
-
-            # Stem and paths
-            stem = choose_stem(key, task)
-            base = f"{seq:04d} - {stem}"
             json_path = outdir / f"{base}.json"
-            pdf_path  = outdir / f"{base}.pdf"
+            out_path  = outdir / f"{base}.{args.format}"
+            extra: List[Path] = []
+            json_path.parent.mkdir(parents=True, exist_ok=True)
 
             # Write JSON
             with open(json_path, "w", encoding="utf-8") as f:
                 json.dump(task, f, indent=2)
 
-            # Render PDF
-            render_pdf(task, pdf_path)
+            attachments: Optional[Dict[str, Path]] = None
+            bundle: Optional[str] = None
+            if args.attachments:
+                from api.attachments import attachment_key, attachment_name, write_bundle
+                mine = [(attachment_key(a), a) for a in task.get("attachments") or []]
+                held = [(k, a) for k, a in mine if k in files]
+                if args.attachments == "embed":
+                    attachments = {k: files[k] for k, _ in held}
+                else:
+                    attachments = {}
+                if args.attachments == "bundle" and held:
+                    zip_path = outdir / f"{base}.attachments.zip"
+                    write_bundle(zip_path, [(attachment_name(a), files[k]) for k, a in held])
+                    bundle = zip_path.name
+                    extra.append(zip_path)
+
+            # Render PDF (or the selected format)
+            local_links = RelativeLinks(targets, out_path.parent)
+            saved = render_output(
+                task, out_path, args.format, local_links, attachments, bundle,
+                optimize=args.optimize, embed_fonts=args.embed_fonts,
+            )
+            if saved:
+                sizes.append(saved)
+            index.record(task_seq, key, task, args.format, out_path, json_path)
 
-            results.append((key, json_path, pdf_path))
-            seq += 1
+            results.append((key, json_path, out_path, extra))
         except Exception as e:
             errors.append(f"{raw} -> {e}")
 
     # Report
     if results:
         print("✅ Created the following files:")
-        for key, jp, pp in results:
-            print(f"  - {jp.name}")
-            print(f"  - {pp.name}")
+        for key, jp, pp, extra in results:
+            for p in [jp, pp] + extra:
+                print(f"  - {p.relative_to(outdir)}")
         print(f"\n📂 Directory: {outdir}")
+    if sizes:
+        before, after = (sum(x) for x in zip(*sizes))
+        print(f"🗜 Optimized {len(sizes)} PDF(s): {before / 1024:.1f} KB -> {after / 1024:.1f} KB "
+              f"({100 * (1 - after / before):.1f}% smaller)")
+
+    index.close()
 
     if errors:
         print("\n⚠️ Some items failed:")
@@ -0,0 +1,305 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import os
+import json
+import time
+import argparse
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass, asdict
+from pathlib import Path
+from typing import Optional, Dict
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from dotenv import load_dotenv
+
+try:
+    import fcntl
+except ImportError:  # Windows: no flock; concurrent runs may then drop each other's entry
+    fcntl = None
+
+# --------------------------------------------------------------------------------------
+# Config
+# --------------------------------------------------------------------------------------
+
+TOKEN_URL = "https://api.clickup.com/api/v2/oauth/token"
+DEFAULT_CACHE = Path.home() / ".cache" / "clickup-pdf-generator" / "tokens.json"
+REFRESH_MARGIN = 300  # seconds before expiry at which a token is refreshed
+MISS_TTL = 60  # seconds a "no OAuth token for this team" answer is remembered
+POOL_SIZE = 8
+
+# --------------------------------------------------------------------------------------
+# Credentials
+# --------------------------------------------------------------------------------------
+
+def ensure_api_key(cli_key: Optional[str]) -> str:
+    """
+    Resolve the personal API key: --api-key > CLICKUP_API_KEY (from environment/.env).
+    """
+    load_dotenv()
+    api = cli_key or os.getenv("CLICKUP_API_KEY")
+    if not api:
+        raise SystemExit("Missing API key. Provide --api-key or set CLICKUP_API_KEY in .env")
+    return api
+
+@dataclass
+class Token:
+    access_token: str
+    refresh_token: Optional[str] = None
+    expires_at: Optional[float] = None  # epoch seconds; None => never expires
+
+    def expires_soon(self, margin: float = REFRESH_MARGIN) -> bool:
+        return self.expires_at is not None and time.time() + margin >= self.expires_at
+
+    @classmethod
+    def from_response(cls, data: Dict, previous: Optional["Token"] = None) -> "Token":
+        expires_in = data.get("expires_in")
+        return cls(
+            access_token=data["access_token"],
+            # Some providers omit refresh_token on refresh; keep the old one then
+            refresh_token=data.get("refresh_token") or (previous.refresh_token if previous else None),
+            expires_at=(time.time() + float(expires_in)) if expires_in else None,
+        )
+
+class TokenCache:
+    """
+    Per-team access tokens persisted as one JSON file: {"<team_id>": {...Token}}.
+    Writes are atomic (tmp + replace) so concurrent runs never see a torn file,
+    and serialised by an flock on <file>.lock so they never drop each other's
+    entries.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+
+    def _read(self) -> Dict[str, Dict]:
+        try:
+            with self.path.open("r", encoding="utf-8") as f:
+                data = json.load(f)
+            return data if isinstance(data, dict) else {}
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    @contextmanager
+    def _locked(self):
+        lock = self.path.with_name(self.path.name + ".lock")
+        with self._lock:
+            lock.parent.mkdir(parents=True, exist_ok=True)
+            with lock.open("a") as f:
+                if fcntl is not None:
+                    fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+                yield  # closing the file releases the lock
+
+    def get(self, team_id: str) -> Optional[Token]:
+        with self._lock:
+            raw = self._read().get(str(team_id))
+        return Token(**raw) if raw else None
+
+    def put(self, team_id: str, token: Token):
+        with self._locked():
+            data = self._read()
+            data[str(team_id)] = asdict(token)
+            tmp = self.path.with_suffix(f".{os.getpid()}.tmp")
+            # Created 0600 up front, so the secrets are never readable by others
+            fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(data, f, indent=2)
+            os.replace(tmp, self.path)
+
+    def teams(self):
+        with self._lock:
+            return list(self._read().keys())
+
+# --------------------------------------------------------------------------------------
+# Token manager
+# --------------------------------------------------------------------------------------
+
+class _TeamAuth(requests.auth.AuthBase):
+    """Resolve the team's token on every request so refreshes apply to live sessions."""
+
+    def __init__(self, manager: "TokenManager", team_id: Optional[str]):
+        self.manager = manager
+        self.team_id = team_id
+
+    def __call__(self, r):
+        r.headers["Authorization"] = self.manager.authorization(self.team_id)
+        return r
+
+class TokenManager:
+    """
+    Hands out ClickUp credentials and pooled HTTP sessions per team.
+    - OAuth tokens are cached on disk per team and refreshed ahead of expiry.
+    - Teams without an OAuth token (or team-less requests) fall back to the API key.
+    - Each team gets its own session, so concurrent workspaces keep separate
+      connection pools and rate-limit budgets.
+    """
+
+    def __init__(
+        self,
+        client_id: Optional[str] = None,
+        client_secret: Optional[str] = None,
+        api_key: Optional[str] = None,
+        cache_path: Optional[Path] = None,
+        token_url: str = TOKEN_URL,
+        margin: float = REFRESH_MARGIN,
+    ):
+        self.client_id = client_id
+        self.client_secret = client_secret
+        self.api_key = api_key
+        self.cache = TokenCache(cache_path or DEFAULT_CACHE)
+        self.token_url = token_url
+        self.margin = margin
+        self._tokens: Dict[str, Token] = {}
+        self._misses: Dict[str, float] = {}  # team -> when the cache last had no token
+        self._sessions: Dict[Optional[str], requests.Session] = {}
+        self._refreshing: Dict[str, threading.Lock] = {}  # team -> held while refreshing
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls, api_key: Optional[str] = None) -> "TokenManager":
+        """
+        Build from .env: CLICKUP_CLIENT_ID, CLICKUP_CLIENT_SECRET, CLICKUP_TOKEN_CACHE,
+        CLICKUP_TOKEN_URL and CLICKUP_API_KEY (overridden by api_key).
+        """
+        load_dotenv()
+        cache = os.getenv("CLICKUP_TOKEN_CACHE")
+        return cls(
+            client_id=os.getenv("CLICKUP_CLIENT_ID"),
+            client_secret=os.getenv("CLICKUP_CLIENT_SECRET"),
+            api_key=api_key or os.getenv("CLICKUP_API_KEY"),
+            cache_path=Path(cache) if cache else None,
+            token_url=os.getenv("CLICKUP_TOKEN_URL") or TOKEN_URL,
+        )
+
+    def has_credentials(self) -> bool:
+        return bool(self.api_key or self.cache.teams())
+
+    # --- token endpoint ---
+
+    def _post_token(self, payload: Dict) -> Dict:
+        if not (self.client_id and self.client_secret):
+            raise RuntimeError("OAuth requires CLICKUP_CLIENT_ID and CLICKUP_CLIENT_SECRET")
+        payload = {"client_id": self.client_id, "client_secret": self.client_secret, **payload}
+        r = requests.post(self.token_url, data=payload, timeout=30)
+        if r.status_code != 200:
+            raise RuntimeError(f"Token endpoint failed. HTTP {r.status_code} - {r.text}")
+        return r.json()
+
+    def exchange_code(self, team_id: str, code: str) -> Token:
+        """Trade an OAuth authorization code for a token and cache it for team_id."""
+        token = Token.from_response(self._post_token({"code": code}))
+        self._store(team_id, token)
+        return token
+
+    def _refresh(self, team_id: str, token: Token) -> Token:
+        data = self._post_token({"grant_type": "refresh_token", "refresh_token": token.refresh_token})
+        fresh = Token.from_response(data, previous=token)
+        self._store(team_id, fresh)
+        return fresh
+
+    def _store(self, team_id: str, token: Token):
+        self.cache.put(team_id, token)
+        with self._lock:
+            self._tokens[str(team_id)] = token
+            self._misses.pop(str(team_id), None)
+
+    # --- lookup ---
+
+    def token_for(self, team_id: Optional[str]) -> Optional[Token]:
+        """Return a valid OAuth token for team_id, refreshing it if close to expiry."""
+        if not team_id:
+            return None
+        key = str(team_id)
+        with self._lock:
+            token = self._tokens.get(key)
+            missed = self._misses.get(key)
+        if token is None:
+            # API-key teams would otherwise re-read tokens.json on every request
+            if missed is not None and time.monotonic() - missed < MISS_TTL:
+                return None
+            token = self.cache.get(key)
+            if token is None:
+                with self._lock:
+                    self._misses[key] = time.monotonic()
+                return None
+        if token.expires_soon(self.margin):
+            # One refresh per team at a time: concurrent requests would otherwise
+            # all spend the same refresh token, which fails once it is rotated
+            with self._lock:
+                refreshing = self._refreshing.setdefault(key, threading.Lock())
+            with refreshing:
+                # Another thread, or another process, may already have refreshed it
+                with self._lock:
+                    latest = self._tokens.get(key) or token
+                if latest.expires_soon(self.margin):
+                    latest = self.cache.get(key) or latest
+                if not latest.expires_soon(self.margin):
+                    token = latest
+                elif latest.refresh_token:
+                    token = self._refresh(key, latest)
+                else:
+                    return None
+        with self._lock:
+            self._tokens[key] = token
+        return token
+
+    def authorization(self, team_id: Optional[str]) -> str:
+        """Authorization header value for team_id (OAuth bearer, else API key)."""
+        token = self.token_for(team_id)
+        if token:
+            return f"Bearer {token.access_token}"
+        if self.api_key:
+            return self.api_key
+        raise RuntimeError(
+            f"No credentials for team {team_id or '(none)'}. "
+            "Set CLICKUP_API_KEY or authorize the team via OAuth."
+        )
+
+    def session(self, team_id: Optional[str]) -> requests.Session:
+        """Pooled session for team_id; 429s are retried honouring Retry-After."""
+        key = str(team_id) if team_id else None
+        with self._lock:
+            s = self._sessions.get(key)
+            if s is None:
+                s = requests.Session()
+                retry = Retry(
+                    total=5, status_forcelist=(429, 502, 503, 504),
+                    backoff_factor=1, respect_retry_after_header=True,
+                    allowed_methods=frozenset({"GET"}),
+                )
+                adapter = HTTPAdapter(pool_connections=POOL_SIZE, pool_maxsize=POOL_SIZE, max_retries=retry)
+                s.mount("https://", adapter)
+                s.mount("http://", adapter)
+                s.auth = _TeamAuth(self, key)
+                self._sessions[key] = s
+        return s
+
+    def close(self):
+        with self._lock:
+            sessions, self._sessions = list(self._sessions.values()), {}
+        for s in sessions:
+            s.close()
+
+# --------------------------------------------------------------------------------------
+# Main
+# --------------------------------------------------------------------------------------
+
+def main():
+    ap = argparse.ArgumentParser(
+        description="Exchange a ClickUp OAuth authorization code and cache the token for a team."
+    )
+    ap.add_argument("team", help="Team (workspace) ID the token belongs to.")
+    ap.add_argument("code", help="Authorization code from the OAuth redirect.")
+    args = ap.parse_args()
+
+    manager = TokenManager.from_env()
+    manager.exchange_code(args.team, args.code)
+    print(f"✅ Cached OAuth token for team {args.team}")
+    print(f"💾 Cache  : {manager.cache.path}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+# backends/__init__.py
+"""
+Output backends: each one lays out a backend-neutral document
+(renderers.iter_document) as a file.
+
+Backends are imported on demand so e.g. HTML export never loads ReportLab.
+"""
+from importlib import import_module
+from pathlib import Path
+from typing import Dict, Iterable
+
+from pdf_generator.document import Block
+
+class Backend:
+    """
+    Interface: write(blocks, out_path, title). `suffix` is the file extension.
+    blocks may be a lazy iterator (renderers.iter_document); backends consume it
+    once and should not hold the whole document in memory.
+    Backend-specific options (e.g. the PDF backend's embed_fonts) are passed to
+    the constructor; backends ignore options they don't know.
+    """
+    name = ''
+    suffix = ''
+
+    def __init__(self, **options):
+        self.options = options
+
+    def write(self, blocks: Iterable[Block], out_path: Path, title: str):
+        raise NotImplementedError
+
+# format name -> "module:Class"
+BACKENDS: Dict[str, str] = {
+    'pdf': 'pdf_generator.backends.pdf_backend:PdfBackend',
+    'html': 'pdf_generator.backends.html_backend:HtmlBackend',
+    'md': 'pdf_generator.backends.markdown_backend:MarkdownBackend',
+}
+
+def get_backend(fmt: str, **options) -> Backend:
+    try:
+        target = BACKENDS[fmt]
+    except KeyError:
+        raise ValueError(f"Unknown output format {fmt!r}. Choose from: {', '.join(BACKENDS)}")
+    module, cls = target.split(':')
+    return getattr(import_module(module), cls)(**options)
@@ -0,0 +1,66 @@
+# html_backend.py
+from pathlib import Path
+from typing import Iterable, Iterator
+
+from pdf_generator.backends import Backend
+from pdf_generator.document import Block, Para, Bullets, Space, Indent, Attachment, HEADING_LEVELS
+from pdf_generator.styles import BLUE, RED
+from pdf_generator.utils import esc
+
+CSS = f"""
+body {{ font-family: Helvetica, Arial, sans-serif; font-size: 10.5pt; line-height: 1.35;
+       max-width: 48em; margin: 2em auto; padding: 0 1em; }}
+h1, h2, h3 {{ color: {BLUE}; margin-bottom: .3em; }}
+a {{ color: {BLUE}; }}
+p {{ margin: 0 0 .3em; }}
+.meta, .link {{ font-size: 9pt; color: #555555; }}
+.link a {{ color: {BLUE}; }}
+.warn {{ color: {RED}; font-style: italic; }}
+.indent {{ border-left: 2px solid #dddddd; padding-left: .8em; }}
+"""
+
+def iter_html(blocks: Iterable[Block]) -> Iterator[str]:
+    """HTML lines for blocks. Inline markup is already escaped ReportLab mini-HTML, which is valid HTML as-is."""
+    depth = 0
+    for b in blocks:
+        if isinstance(b, Para):
+            level = HEADING_LEVELS.get(b.style)
+            if level:
+                yield f"<h{level}>{b.text}</h{level}>\n"
+            elif b.style == 'body':
+                yield f"<p>{b.text}</p>\n"
+            else:
+                yield f'<p class="{b.style}">{b.text}</p>\n'
+        elif isinstance(b, Bullets):
+            yield "<ul>" + "".join(f"<li>{x}</li>" for x in b.items) + "</ul>\n"
+        elif isinstance(b, Indent):
+            if b.left > 0:
+                yield '<div class="indent">\n'; depth += 1
+            elif depth:
+                yield "</div>\n"; depth -= 1
+        elif isinstance(b, Attachment):
+            # HTML can't carry the file itself; point at the local copy
+            src, name = esc(b.path.resolve().as_uri()), esc(b.name)
+            if b.mimetype.startswith('image/'):
+                yield f'<p><img src="{src}" alt="{name}" style="max-width: 100%"></p>\n'
+            yield f'<p class="link"><a href="{src}">{name}</a></p>\n'
+        elif isinstance(b, Space):
+            pass  # spacing is handled by CSS margins
+    for _ in range(depth):
+        yield "</div>\n"
+
+def to_html(blocks: Iterable[Block]) -> str:
+    return "".join(iter_html(blocks))
+
+class HtmlBackend(Backend):
+    name = 'html'
+    suffix = 'html'
+
+    def write(self, blocks: Iterable[Block], out_path: Path, title: str):
+        with Path(out_path).open('w', encoding='utf-8') as f:
+            f.write(
+                "<!DOCTYPE html>\n<html lang=\"en\">\n<head>\n<meta charset=\"utf-8\">\n"
+                f"<title>{esc(title)}</title>\n<style>{CSS}</style>\n</head>\n<body>\n"
+            )
+            f.writelines(iter_html(blocks))
+            f.write("</body>\n</html>\n")
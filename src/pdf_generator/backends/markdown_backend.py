@@ -0,0 +1,100 @@
+# markdown_backend.py
+import re
+from html import unescape
+from pathlib import Path
+from typing import Iterable, Iterator
+
+from pdf_generator.backends import Backend
+from pdf_generator.document import Block, Para, Bullets, Space, Indent, Attachment, HEADING_LEVELS
+from pdf_generator.utils import is_safe_href
+
+_TOKEN_RE = re.compile(r'<a href="([^"]*)">|(</a>)|<(/?)(b|i|strong|em)>|(<br\s*/?>)')
+_MD_TAGS = {'b': '**', 'strong': '**', 'i': '*', 'em': '*'}
+# Characters Markdown (or HTML inside Markdown) would interpret; '&' only where it starts an entity
+_MD_SPECIAL_RE = re.compile(r"([\\`*_\[\]<>|]|&(?=#?\w+;))")
+# Text that would turn a line into a heading, list item or ordered list item
+_LINE_START_RE = re.compile(r"^(\s*)(#|[+-](?=\s|$)|\d+(?=[.)](?:\s|$)))", re.M)
+_HREF_QUOTE = {ord(" "): "%20", ord('"'): "%22", ord("("): "%28", ord(")"): "%29", ord("<"): "%3C", ord(">"): "%3E"}
+
+def md_text(text: str) -> str:
+    """Plain text → Markdown that displays exactly that text."""
+    return _MD_SPECIAL_RE.sub(r"\\\1", text)
+
+def inline_to_md(text: str) -> str:
+    """
+    ReportLab mini-HTML (<b>, <i>, <a>, <br/>) → Markdown. Text between the
+    tags is unescaped and re-escaped for Markdown, so task text never turns
+    into live HTML or Markdown syntax.
+    """
+    out = []
+    links = []  # open <a>: Markdown href, or None for a target that is not linked
+    pos = 0
+    for m in _TOKEN_RE.finditer(text):
+        out.append(md_text(unescape(text[pos:m.start()])))
+        pos = m.end()
+        href, close, _, tag, _ = m.groups()
+        if href is not None:
+            href = unescape(href)
+            links.append(href.translate(_HREF_QUOTE) if is_safe_href(href) else None)
+            if links[-1] is not None:
+                out.append("[")
+        elif close:
+            target = links.pop() if links else None
+            if target is not None:
+                out.append(f"]({target})")
+        elif tag:
+            out.append(_MD_TAGS[tag])
+        else:
+            out.append("\\\n")
+    out.append(md_text(unescape(text[pos:])))
+    return _LINE_START_RE.sub(_escape_line_start, "".join(out))
+
+def _escape_line_start(m: re.Match) -> str:
+    indent, marker = m.groups()
+    # "# x" / "- x" → "\# x" / "\- x"; "1. x" → "1\. x"
+    return f"{indent}{marker}\\" if marker[0].isdigit() else f"{indent}\\{marker}"
+
+def iter_markdown(blocks: Iterable[Block]) -> Iterator[str]:
+    """Markdown lines (newline-terminated) for blocks, with one blank line between blocks."""
+    depth = 0
+    started = False
+
+    for b in blocks:
+        if isinstance(b, Indent):
+            depth = depth + 1 if b.left > 0 else max(0, depth - 1)
+            continue
+        if isinstance(b, Space):
+            continue
+        if started:
+            # Inside a quote the separator stays quoted
+            yield ">" * depth + "\n"
+        started = True
+
+        prefix = "> " * depth
+        if isinstance(b, Para):
+            level = HEADING_LEVELS.get(b.style)
+            text = inline_to_md(b.text)
+            if level:
+                text = f"{'#' * level} {text}"
+            elif b.style == 'warn':
+                text = f"*{text}*"
+            for ln in text.split("\n"):
+                yield (prefix + ln).rstrip() + "\n"
+        elif isinstance(b, Bullets):
+            for x in b.items:
+                for ln in f"- {inline_to_md(x)}".split("\n"):
+                    yield (prefix + ln).rstrip() + "\n"
+        elif isinstance(b, Attachment):
+            bang = "!" if b.mimetype.startswith('image/') else ""
+            yield f"{prefix}{bang}[{md_text(b.name)}](<{b.path.resolve().as_uri()}>)\n"
+
+def to_markdown(blocks: Iterable[Block]) -> str:
+    return "".join(iter_markdown(blocks))
+
+class MarkdownBackend(Backend):
+    name = 'md'
+    suffix = 'md'
+
+    def write(self, blocks: Iterable[Block], out_path: Path, title: str):
+        with Path(out_path).open('w', encoding='utf-8') as f:
+            f.writelines(iter_markdown(blocks))
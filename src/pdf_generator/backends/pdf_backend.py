@@ -0,0 +1,148 @@
+# pdf_backend.py
+from pathlib import Path
+from typing import Any, Iterable, Iterator
+
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.units import mm
+from reportlab.pdfbase.pdfdoc import Annotation, PDFDictionary, PDFName, PDFStream, PDFString
+from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, ListFlowable, ListItem, Indenter, Image, Flowable
+
+from pdf_generator.backends import Backend
+from pdf_generator.document import Block, Para, Bullets, Space, Indent, Attachment
+from pdf_generator.styles import build_styles, register_embedded_fonts
+from pdf_generator.utils import esc
+
+PAGE_IMAGE_TYPES = ('image/png', 'image/jpeg', 'image/gif')
+MAX_IMAGE_HEIGHT = 200*mm
+
+class FileAttachmentAnnotation(Annotation):
+    """/FileAttachment annotation carrying the file itself as an embedded file stream."""
+    permitted = Annotation.permitted + ("FS", "Name")
+
+    def __init__(self, Rect, path: Path, name: str, mimetype: str = ''):
+        self.Rect = Rect
+        self.path = path
+        self.name = name
+        self.mimetype = mimetype
+
+    def format(self, document):
+        data = self.path.read_bytes()
+        stream = PDFDictionary({'Type': PDFName('EmbeddedFile'), 'Params': PDFDictionary({'Size': len(data)})})
+        if self.mimetype:
+            # PDFName does not escape '/', which a MIME type always contains
+            stream['Subtype'] = '/' + self.mimetype.replace('#', '#23').replace('/', '#2F')
+        spec = PDFDictionary({
+            'Type': PDFName('Filespec'),
+            'F': PDFString(self.name),
+            'UF': PDFString(self.name),
+            'EF': PDFDictionary({'F': document.Reference(PDFStream(stream, data))}),
+        })
+        d = self.AnnotationDict(Rect=self.Rect, Contents=self.name, Subtype='/FileAttachment', FS=spec, Name='/Paperclip')
+        return d.format(document)
+
+class AttachedFile(Flowable):
+    """A caption line that carries the file as a PDF file attachment (clickable paperclip)."""
+
+    def __init__(self, att: Attachment, style):
+        super().__init__()
+        self.att = att
+        size = att.path.stat().st_size
+        self.para = Paragraph(f"<b>Attached file:</b> {esc(att.name)} ({size / 1024:.1f} KB)", style)
+
+    def wrap(self, aw, ah):
+        self.width, self.height = self.para.wrap(aw, ah)
+        return self.width, self.height
+
+    def draw(self):
+        self.para.drawOn(self.canv, 0, 0)
+        x0, y0 = self.canv.absolutePosition(0, 0)
+        x1, y1 = self.canv.absolutePosition(self.width, self.height)
+        self.canv._addAnnotation(FileAttachmentAnnotation((x0, y0, x1, y1), self.att.path, self.att.name, self.att.mimetype))
+
+def attachment_flowables(att: Attachment, styles) -> Iterator[Any]:
+    """Images become page images (scaled to fit) with a caption; other files are attached."""
+    if att.mimetype in PAGE_IMAGE_TYPES:
+        try:
+            img = Image(str(att.path), width=A4[0] - 36*mm, height=MAX_IMAGE_HEIGHT, kind='bound')
+        except Exception:
+            img = None  # unreadable image: attach the file instead
+        if img is not None:
+            yield img
+            yield Paragraph(esc(att.name), styles['meta'])
+            return
+    yield AttachedFile(att, styles['link'])
+
+def iter_flowables(blocks: Iterable[Block], styles) -> Iterator[Any]:
+    """Map document blocks onto ReportLab flowables, one at a time."""
+    for b in blocks:
+        if isinstance(b, Para):
+            yield Paragraph(b.text, styles[b.style])
+        elif isinstance(b, Bullets):
+            items = [ListItem(Paragraph(x, styles['body'])) for x in b.items]
+            yield ListFlowable(items, bulletType='bullet', start='•', leftIndent=b.indent,
+                               bulletFontName=styles['body'].fontName)
+        elif isinstance(b, Space):
+            yield Spacer(1, b.height)
+        elif isinstance(b, Indent):
+            yield Indenter(left=b.left)
+        elif isinstance(b, Attachment):
+            yield from attachment_flowables(b, styles)
+
+class LazyFlowables(list):
+    """
+    List facade over a flowable iterator for doc.build().
+    ReportLab only touches the front of the story (flowables[0], [:i] for
+    keepWithNext groups, insert/del at 0), so keeping a small look-ahead window
+    buffered is enough; the rest of the story is built as layout reaches it.
+    len() reports the buffered window, not the total.
+    """
+
+    def __init__(self, flowables: Iterable[Any], lookahead: int = 32):
+        super().__init__()
+        self._source = iter(flowables)
+        self._lookahead = lookahead
+
+    def _fill(self, n: int):
+        while self._source is not None and list.__len__(self) < n:
+            try:
+                self.append(next(self._source))
+            except StopIteration:
+                self._source = None
+
+    def __len__(self):
+        self._fill(self._lookahead)
+        return list.__len__(self)
+
+    def __bool__(self):
+        return len(self) > 0
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            self._fill(self._lookahead if i.stop is None or i.stop < 0 else i.stop)
+        else:
+            self._fill(i + 1 if i >= 0 else self._lookahead)
+        return list.__getitem__(self, i)
+
+class PdfBackend(Backend):
+    """
+    Options: embed_fonts -- None (built-in Helvetica, not embedded), or a
+    directory ('' to search the usual system locations) holding the TrueType
+    family of styles.register_embedded_fonts, embedded as subsets.
+    """
+    name = 'pdf'
+    suffix = 'pdf'
+
+    def write(self, blocks: Iterable[Block], out_path: Path, title: str):
+        embed = self.options.get('embed_fonts')
+        fonts = register_embedded_fonts(embed or None) if embed is not None else None
+        doc = SimpleDocTemplate(
+            str(out_path),
+            pagesize=A4,
+            leftMargin=18*mm, rightMargin=18*mm,
+            topMargin=16*mm, bottomMargin=16*mm,
+            title=title,
+            author="clickup-pdf-generator",
+            # Otherwise every page still references the (unembedded) base font
+            initialFontName=fonts['Helvetica'] if fonts else None,
+        )
+        doc.build(LazyFlowables(iter_flowables(blocks, build_styles(fonts))))
@@ -0,0 +1,40 @@
+# document.py
+"""
+Backend-neutral document model.
+
+renderers.build_document() turns a task into a flat list of these blocks; the
+output backends (pdf_generator.backends) lay them out as PDF, HTML or Markdown.
+Inline text uses the small, already-escaped HTML subset ReportLab understands:
+<b>, <i>, <a href="…">, <br/>.
+"""
+from dataclasses import dataclass
+from pathlib import Path
+from typing import List, Union
+
+@dataclass
+class Para:
+    text: str
+    style: str = 'body'  # body | h1 | h2 | h3 | meta | link | warn
+
+@dataclass
+class Bullets:
+    items: List[str]
+    indent: float = 16
+
+@dataclass
+class Space:
+    height: float
+
+@dataclass
+class Indent:
+    left: float  # positive opens an indented region, negative closes it
+
+@dataclass
+class Attachment:
+    path: Path  # local file to embed (images as page images, anything else as a file attachment)
+    name: str
+    mimetype: str = ''
+
+Block = Union[Para, Bullets, Space, Indent, Attachment]
+
+HEADING_LEVELS = {'h1': 1, 'h2': 2, 'h3': 3}
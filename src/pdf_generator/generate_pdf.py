@@ -4,35 +4,30 @@
 
 import argparse, json
 from pathlib import Path
-from reportlab.lib.pagesizes import A4
-from reportlab.lib.units import mm
-from reportlab.platypus import SimpleDocTemplate
-from pdf_generator.renderers import build_story
+
+FORMATS = ('pdf', 'html', 'md')  # keys of pdf_generator.backends.BACKENDS
 
 def main():
-    ap = argparse.ArgumentParser(description="Generate formatted PDF from ClickUp JSON.")
+    ap = argparse.ArgumentParser(description="Generate formatted PDF (or HTML/Markdown) from ClickUp JSON.")
     ap.add_argument('--in', dest='infile', default='task_data.json', help='Path to task JSON')
-    ap.add_argument('--out', dest='outfile', default='output.pdf', help='Output PDF path')
+    ap.add_argument('--out', dest='outfile', default=None, help='Output path (default: output.<format>)')
+    ap.add_argument('--format', choices=FORMATS, default='pdf', help='Output format (default: pdf)')
     args = ap.parse_args()
 
-    in_path, out_path = Path(args.infile), Path(args.outfile)
+    in_path = Path(args.infile)
+    out_path = Path(args.outfile or f"output.{args.format}")
     if not in_path.exists():
         raise FileNotFoundError(f"Input not found: {in_path}")
 
     with in_path.open('r', encoding='utf-8') as f:
         task = json.load(f)
 
-    doc = SimpleDocTemplate(
-        str(out_path),
-        pagesize=A4,
-        leftMargin=18*mm, rightMargin=18*mm,
-        topMargin=16*mm, bottomMargin=16*mm,
-        title=task.get('name') or 'ClickUp PDF',
-        author="clickup-pdf-generator",
-    )
-    story = build_story(task)
-    doc.build(story)
-    print(f"PDF written to: {out_path}")
+    # Backends load their dependencies (e.g. ReportLab) only when selected
+    from pdf_generator.backends import get_backend
+    from pdf_generator.renderers import iter_document
+
+    get_backend(args.format).write(iter_document(task), out_path, title=task.get('name') or 'ClickUp PDF')
+    print(f"{args.format.upper()} written to: {out_path}")
 
 if __name__ == '__main__':
     main()
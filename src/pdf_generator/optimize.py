@@ -0,0 +1,293 @@
+# optimize.py
+"""
+Size optimisation pass for the PDFs the ReportLab backend writes.
+
+ReportLab compresses page streams but wraps them in ASCII85 (+25% size),
+leaves some streams (e.g. embedded attachments) unfiltered and names images
+by file path, so identical images from different paths are stored twice.
+optimize_pdf() rewrites the file object by object:
+  - ASCII85+Flate streams are decoded and recompressed as plain Flate (level 9)
+  - unfiltered streams are Flate-compressed when that makes them smaller
+  - byte-identical stream objects (image XObjects, fonts, embedded files)
+    are stored once; references to the duplicates are redirected
+  - all other objects (page dictionaries, link annotations, fonts, outlines)
+    are packed into compressed object streams with a cross-reference stream
+    (PDF 1.5), which is where most bytes of link-heavy documents go
+The result keeps the original object numbers (dropped objects become free
+xref entries), so nothing else in the file needs to change.
+
+It relies on the regular layout ReportLab emits (direct /Length, no object
+streams or incremental updates); other PDFs are returned unchanged.
+"""
+import re
+import zlib
+import base64
+import hashlib
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+LEVEL = 9
+OBJS_PER_STREAM = 200
+
+_OBJ_RE = re.compile(rb"(\d+) 0 obj\r?\n")
+_STREAM_RE = re.compile(rb"stream\r?\n")
+_LENGTH_RE = re.compile(rb"/Length (\d+)")
+_FILTER_RE = re.compile(rb"/Filter\s*(\[[^\]]*\]|/\w+)")
+_REF_RE = re.compile(rb"\b(\d+) 0 R\b")
+_TRAILER_RE = re.compile(rb"\bxref\r?\n.*?trailer\r?\n(.*?)startxref", re.S)
+_TRAILER_KEYS_RE = re.compile(rb"/(Root|Info) (\d+) 0 R|/ID\s*(\[[^\]]*\])")
+
+class _Obj:
+    __slots__ = ("num", "head", "data")
+
+    def __init__(self, num: int, head: bytes, data: Optional[bytes]):
+        self.num = num
+        self.head = head  # object body (a stream's dictionary)
+        self.data = data  # raw stream bytes, None for non-stream objects
+
+def _parse(pdf: bytes) -> Optional[Tuple[bytes, List[_Obj], bytes]]:
+    """(header, objects, trailer dictionary) or None if the layout is unexpected."""
+    first = _OBJ_RE.search(pdf)
+    trailer = _TRAILER_RE.search(pdf)
+    if not first or not trailer or pdf.count(b"startxref") != 1:
+        return None
+    objs: List[_Obj] = []
+    pos = first.start()
+    end = trailer.start()
+    while pos < end:
+        m = _OBJ_RE.match(pdf, pos)
+        if not m:
+            return None
+        body_start = m.end()
+        s = _STREAM_RE.search(pdf, body_start)
+        stop = pdf.find(b"endobj", body_start)
+        if stop < 0:
+            return None
+        if s and s.start() < stop:
+            length = _LENGTH_RE.search(pdf, body_start, s.start())
+            if not length:
+                return None
+            data_start = s.end()
+            data_end = data_start + int(length.group(1))
+            objs.append(_Obj(int(m.group(1)), pdf[body_start:s.start()].rstrip(), pdf[data_start:data_end]))
+            stop = pdf.find(b"endobj", data_end)
+        else:
+            objs.append(_Obj(int(m.group(1)), pdf[body_start:stop].rstrip(), None))
+        pos = stop + len(b"endobj")
+        while pos < end and pdf[pos:pos + 1] in b"\r\n":
+            pos += 1
+    return pdf[:first.start()], objs, trailer.group(1)
+
+def _recompress(obj: _Obj):
+    """Rewrite one stream as plain Flate at LEVEL where that is possible and smaller."""
+    f = _FILTER_RE.search(obj.head)
+    names = f.group(1).strip(b"[] ").split() if f else []
+    if b"/DecodeParms" in obj.head:
+        return  # parameters are tied to the filter chain; leave those streams alone
+    if names == [b"/ASCII85Decode", b"/FlateDecode"]:
+        raw = obj.data.strip()
+        raw = raw[:-2] if raw.endswith(b"~>") else raw
+        try:
+            plain = zlib.decompress(base64.a85decode(raw))
+        except (ValueError, zlib.error):
+            return
+    elif not names:
+        plain = obj.data
+    else:
+        return  # already binary-filtered (Flate, DCT, ...)
+    packed = zlib.compress(plain, LEVEL)
+    if names or len(packed) < len(plain):
+        head = _FILTER_RE.sub(b"", obj.head) if f else obj.head
+        obj.head = head.replace(b"<<", b"<<\n/Filter /FlateDecode", 1)
+        obj.data = packed
+    obj.head = _LENGTH_RE.sub(b"/Length %d" % len(obj.data), obj.head)
+
+def optimize_pdf(pdf: bytes) -> bytes:
+    """Smaller equivalent of a ReportLab-generated PDF (see module docstring)."""
+    parsed = _parse(pdf)
+    if parsed is None:
+        return pdf
+    header, objs, trailer = parsed
+
+    for o in objs:
+        if o.data is not None:
+            _recompress(o)
+
+    # Identical streams (same dictionary apart from /Length, same bytes) are kept once
+    canonical: Dict[bytes, int] = {}
+    alias: Dict[int, int] = {}
+    for o in objs:
+        if o.data is None:
+            continue
+        digest = hashlib.sha256(_LENGTH_RE.sub(b"", o.head) + b"\0" + o.data).digest()
+        first = canonical.setdefault(digest, o.num)
+        if first != o.num:
+            alias[o.num] = first
+
+    def redirect(m):
+        n = int(m.group(1))
+        return b"%d 0 R" % alias[n] if n in alias else m.group(0)
+
+    kept = [o for o in objs if o.num not in alias]
+    if alias:
+        for o in kept:
+            o.head = _REF_RE.sub(redirect, o.head)
+        trailer = _REF_RE.sub(redirect, trailer)
+    return _write(header, kept, trailer, max(o.num for o in objs) + 1)
+
+def _write(header: bytes, objs: List[_Obj], trailer: bytes, size: int) -> bytes:
+    """
+    Serialise with stream objects written directly and every other object
+    packed into Flate-compressed object streams, indexed by an xref stream.
+    """
+    # Entries: num -> (type, field2, field3) as in a PDF 1.5 xref stream
+    entries: Dict[int, Tuple[int, int, int]] = {}
+    out = bytearray(header.replace(b"%PDF-1.4", b"%PDF-1.5", 1))
+
+    for o in objs:
+        if o.data is not None:
+            entries[o.num] = (1, len(out), 0)
+            out += b"%d 0 obj\n" % o.num + o.head + b"\nstream\n" + o.data + b"\nendstream\nendobj\n"
+
+    plain = [o for o in objs if o.data is None]
+    next_num = size
+    for i in range(0, len(plain), OBJS_PER_STREAM):
+        group = plain[i:i + OBJS_PER_STREAM]
+        num = next_num
+        next_num += 1
+        offsets, body = [], bytearray()
+        for idx, o in enumerate(group):
+            offsets.append(b"%d %d" % (o.num, len(body)))
+            body += o.head + b"\n"
+            entries[o.num] = (2, num, idx)
+        index = b" ".join(offsets) + b"\n"
+        data = zlib.compress(index + bytes(body), LEVEL)
+        entries[num] = (1, len(out), 0)
+        out += (b"%d 0 obj\n<< /Type /ObjStm /N %d /First %d /Filter /FlateDecode /Length %d >>\nstream\n"
+                % (num, len(group), len(index), len(data))) + data + b"\nendstream\nendobj\n"
+
+    xref_num = next_num
+    entries[xref_num] = (1, len(out), 0)
+    rows = bytearray()
+    for n in range(xref_num + 1):
+        kind, a, b = entries.get(n, (0, 0, 65535 if n == 0 else 0))
+        rows += bytes((kind,)) + a.to_bytes(4, "big") + b.to_bytes(2, "big")
+    data = zlib.compress(bytes(rows), LEVEL)
+    extra = b""
+    for m in _TRAILER_KEYS_RE.finditer(trailer):
+        extra += b" /%s %s 0 R" % (m.group(1), m.group(2)) if m.group(1) else b" /ID " + m.group(3)
+    out += (b"%d 0 obj\n<< /Type /XRef /Size %d /W [1 4 2] /Filter /FlateDecode /Length %d%s >>\nstream\n"
+            % (xref_num, xref_num + 1, len(data), extra)) + data + b"\nendstream\nendobj\n"
+    out += b"startxref\n%d\n%%%%EOF\n" % entries[xref_num][1]
+    return bytes(out)
+
+# --------------------------------------------------------------------------------------
+# Page count
+# --------------------------------------------------------------------------------------
+
+_STARTXREF_RE = re.compile(rb"startxref\s+(\d+)\s+%%EOF\s*$")
+_XREF_SUB_RE = re.compile(rb"\s*(\d+) (\d+)\s+")
+_XREF_ROW_RE = re.compile(rb"(\d{10}) \d{5} ([nf])\s*")
+_OBJ_AT_RE = re.compile(rb"\s*(\d+) \d+ obj\s*")
+
+def _key_int(d: bytes, key: bytes) -> Optional[int]:
+    m = re.search(rb"/" + key + rb"\s+(\d+)(?!\s+\d+ R)", d)
+    return int(m.group(1)) if m else None
+
+def _key_ref(d: bytes, key: bytes) -> Optional[int]:
+    m = re.search(rb"/" + key + rb"\s+(\d+) \d+ R", d)
+    return int(m.group(1)) if m else None
+
+def _stream_at(pdf: bytes, offset: int) -> Tuple[bytes, bytes]:
+    """(dictionary, decoded stream data) of the indirect stream object at offset."""
+    m = _OBJ_AT_RE.match(pdf, offset)
+    s = _STREAM_RE.search(pdf, m.end())
+    head = pdf[m.end():s.start()]
+    data = pdf[s.end():s.end() + _key_int(head, b"Length")]
+    if b"/FlateDecode" in head:
+        data = zlib.decompress(data)
+    return head, data
+
+def _xref(pdf: bytes) -> Tuple[Dict[int, Tuple[int, int, int]], bytes]:
+    """Cross-reference entries (num -> (type, field2, field3)) and the newest trailer dictionary."""
+    entries: Dict[int, Tuple[int, int, int]] = {}
+    trailer = None
+    offset, seen = int(_STARTXREF_RE.search(pdf[-1024:]).group(1)), set()
+    while offset is not None and offset not in seen:
+        seen.add(offset)
+        if pdf.startswith(b"xref", offset):  # classic table
+            pos = offset + 4
+            while True:
+                m = _XREF_SUB_RE.match(pdf, pos)
+                if not m:
+                    break
+                first, count = int(m.group(1)), int(m.group(2))
+                pos = m.end()
+                for num in range(first, first + count):
+                    row = _XREF_ROW_RE.match(pdf, pos)
+                    entries.setdefault(num, (1 if row.group(2) == b"n" else 0, int(row.group(1)), 0))
+                    pos = row.end()
+            end = pdf.index(b"startxref", pos)
+            head = pdf[pdf.index(b"trailer", pos) + 7:end]
+        else:  # cross-reference stream
+            head, data = _stream_at(pdf, offset)
+            w = [int(x) for x in re.search(rb"/W\s*\[([\d\s]+)\]", head).group(1).split()]
+            index = re.search(rb"/Index\s*\[([\d\s]+)\]", head)
+            bounds = [int(x) for x in index.group(1).split()] if index else [0, _key_int(head, b"Size")]
+            row, pos = sum(w), 0
+            for first, count in zip(bounds[::2], bounds[1::2]):
+                for num in range(first, first + count):
+                    f, p = [], pos
+                    for width in w:
+                        f.append(int.from_bytes(data[p:p + width], "big") if width else (1 if not f else 0))
+                        p += width
+                    pos += row
+                    entries.setdefault(num, (f[0], f[1], f[2]))
+        trailer = trailer or head
+        offset = _key_int(head, b"Prev")
+    return entries, trailer
+
+def _object(pdf: bytes, entries: Dict[int, Tuple[int, int, int]], num: int,
+            objstms: Dict[int, Tuple[bytes, bytes]]) -> bytes:
+    """Body of object num (a stream's dictionary only), direct or inside an object stream."""
+    kind, a, b = entries[num]
+    if kind == 1:
+        m = _OBJ_AT_RE.match(pdf, a)
+        stop = min(x for x in (pdf.find(b"endobj", m.end()), pdf.find(b"stream", m.end())) if x >= 0)
+        return pdf[m.end():stop]
+    if a not in objstms:
+        objstms[a] = _stream_at(pdf, entries[a][1])
+    head, data = objstms[a]
+    first = _key_int(head, b"First")
+    pairs = [int(x) for x in data[:first].split()]
+    start = first + pairs[2 * b + 1]
+    stop = first + pairs[2 * b + 3] if 2 * b + 3 < len(pairs) else len(data)
+    return data[start:stop]
+
+def count_pages(pdf: bytes) -> Optional[int]:
+    """
+    Page count from /Count of the root /Pages node, found through the
+    cross-reference table or stream (so object streams and embedded files,
+    whose bytes may look like page objects, are handled). None if the file
+    cannot be read this way.
+    """
+    try:
+        entries, trailer = _xref(pdf)
+        objstms: Dict[int, Tuple[bytes, bytes]] = {}
+        catalog = _object(pdf, entries, _key_ref(trailer, b"Root"), objstms)
+        pages = _object(pdf, entries, _key_ref(catalog, b"Pages"), objstms)
+        return _key_int(pages, b"Count")
+    except (AttributeError, KeyError, IndexError, TypeError, ValueError, zlib.error):
+        return None
+
+def optimize_file(path: Path) -> Tuple[int, int]:
+    """Optimise a PDF in place; returns (bytes before, bytes after)."""
+    path = Path(path)
+    before = path.read_bytes()
+    after = optimize_pdf(before)
+    if len(after) < len(before):
+        tmp = path.with_suffix(".opt.tmp")
+        tmp.write_bytes(after)
+        tmp.replace(path)
+        return len(before), len(after)
+    return len(before), len(before)
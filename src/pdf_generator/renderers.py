@@ -1,17 +1,84 @@
 # renderers.py
 import json
-from typing import Any, Dict, List
-
-from reportlab.platypus import Paragraph, Spacer, ListFlowable, ListItem
-from reportlab.lib.units import inch
+import re
+from datetime import datetime, timezone
+from functools import partial
+from pathlib import Path
+from urllib.parse import quote
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+
+from pdf_generator.document import Block, Para, Bullets, Space, Indent, Attachment
+from pdf_generator.utils import esc, link_html, coalesce_list_attr, md_inline_to_html, urlify_text, TaskLookup
+
+# Section builders are generators so huge fields are produced on demand; these
+# bounds keep any single paragraph/list small enough to lay out cheaply.
+MAX_PARA_CHARS = 4000
+MAX_LIST_ITEMS = 200
+STREAM_OPS_ABOVE = 1 << 20  # rich-text JSON larger than this is decoded op by op
+
+_decoder = json.JSONDecoder()
+_OPS_START_RE = re.compile(r'\s*\{\s*"ops"\s*:\s*\[')
+_WS_RE = re.compile(r'[\s,]*')
+_OPS_END_RE = re.compile(r'\]\s*(?:,[\s\S]*)?\}\s*\Z')
+
+def _iter_quill_ops(rich: str) -> Iterator[Dict[str, Any]]:
+    """
+    Yield the ops of a Quill Delta JSON string one at a time instead of
+    building the whole list; huge fields would otherwise be fully decoded up
+    front. Malformed JSON raises ValueError where it is found.
+    """
+    m = _OPS_START_RE.match(rich)
+    pos = m.end()
+    n = len(rich)
+    while True:
+        pos = _WS_RE.match(rich, pos).end()
+        if pos >= n:
+            raise ValueError("Unterminated Quill ops array")
+        if rich[pos] == ']':
+            if not _OPS_END_RE.match(rich, pos):
+                raise ValueError("Malformed Quill Delta after the ops array")
+            return
+        op, pos = _decoder.raw_decode(rich, pos)
+        yield op
 
-from pdf_generator.styles import build_styles
-from pdf_generator.utils import esc, coalesce_list_attr, md_inline_to_html
+def _quill_ops_ok(rich: str) -> bool:
+    """Decode every op once, keeping none, so a broken field is detected before anything is rendered."""
+    try:
+        for _ in _iter_quill_ops(rich):
+            pass
+    except ValueError:
+        return False
+    return True
+
+def _split_text(text: str, limit: int = MAX_PARA_CHARS) -> Iterator[str]:
+    """Split plain text into pieces of at most limit chars, preferring whitespace."""
+    start, n = 0, len(text)
+    while n - start > limit:
+        cut = text.rfind(' ', start + limit // 2, start + limit)
+        cut = cut + 1 if cut >= 0 else start + limit
+        yield text[start:cut]
+        start = cut
+    yield text[start:]
+
+def _bullet_chunks(items: List[str], indent: float = 16) -> Iterator[Block]:
+    for i in range(0, len(items), MAX_LIST_ITEMS):
+        yield Bullets(items[i:i + MAX_LIST_ITEMS], indent)
+
+def _iter_lines(text: str) -> Iterator[str]:
+    """Same as text.split('\\n'), without materialising every line up front."""
+    start = 0
+    while True:
+        end = text.find('\n', start)
+        if end < 0:
+            yield text[start:]
+            return
+        yield text[start:end]
+        start = end + 1
 
-def _wrap_inline(text: str, attrs: Dict[str, Any]) -> str:
+def _wrap_inline(text: str, attrs: Dict[str, Any], urlify: Callable[[str], str] = urlify_text) -> str:
     """Apply inline formatting supported by ReportLab (<b>, <i>, <a>)."""
-    t = esc(text)
     link = attrs.get('link')
+    t = esc(text) if link else urlify(text)
     bold = bool(attrs.get('bold'))
     italic = bool(attrs.get('italic'))
     if bold:
@@ -19,21 +86,23 @@ def _wrap_inline(text: str, attrs: Dict[str, Any]) -> str:
     if italic:
         t = f"<i>{t}</i>"
     if link:
-        href = esc(str(link))
-        t = f'<a href="{href}">{t}</a>'
+        t = link_html(str(link), t)
     return t
 
-def quill_to_flowables(delta_ops: List[Dict[str, Any]], styles) -> List[Any]:
-    """Convert Quill Delta to flowables (handles attrs on newline)."""
-    flow: List[Any] = []
+def quill_to_blocks(delta_ops: Iterable[Dict[str, Any]], urlify: Callable[[str], str] = urlify_text) -> Iterator[Block]:
+    """
+    Convert Quill Delta to document blocks, lazily (handles attrs on newline).
+    Lines longer than MAX_PARA_CHARS continue in a new paragraph and bullet
+    runs are split every MAX_LIST_ITEMS items.
+    """
+    flow: List[Block] = []  # blocks produced by the current op, drained after each op
     line_buf = ""
     bullet_buf: List[str] = []
 
     def flush_bullets():
         nonlocal bullet_buf
         if bullet_buf:
-            items = [ListItem(Paragraph(x, styles['body'])) for x in bullet_buf]
-            flow.append(ListFlowable(items, bulletType='bullet', start='•', leftIndent=16))
+            flow.append(Bullets(bullet_buf))
             bullet_buf = []
 
     def emit_block(text: str, attrs: Dict[str, Any]):
@@ -42,136 +111,135 @@ def quill_to_flowables(delta_ops: List[Dict[str, Any]], styles) -> List[Any]:
         if list_attr == 'bullet':
             if text.strip():
                 bullet_buf.append(text.strip())
+                if len(bullet_buf) >= MAX_LIST_ITEMS:
+                    flush_bullets()
             return
         flush_bullets()
         text = text.strip()
         if not text:
-            flow.append(Spacer(1, 2)); return
-        if header == 1:
-            flow.append(Paragraph(text, styles['h1']))
-        elif header == 2:
-            flow.append(Paragraph(text, styles['h2']))
-        elif header == 3:
-            flow.append(Paragraph(text, styles['h3']))
+            flow.append(Space(2)); return
+        if header in (1, 2, 3):
+            flow.append(Para(text, f'h{header}'))
         else:
-            flow.append(Paragraph(text, styles['body']))
+            flow.append(Para(text))
+
+    def add_inline(text: str, attrs: Dict[str, Any]):
+        nonlocal line_buf
+        for piece in _split_text(text):
+            if len(line_buf) + len(piece) > MAX_PARA_CHARS and line_buf.strip():
+                emit_block(line_buf, {})
+                line_buf = ""
+            line_buf += _wrap_inline(piece, attrs, urlify)
 
     for op in delta_ops:
         ins = op.get('insert', '')
         attrs = op.get('attributes', {}) or {}
         if isinstance(ins, str) and ins != '\n':
             if '\n' in ins:
-                parts = ins.split('\n')
-                for part in parts[:-1]:
-                    line_buf += _wrap_inline(part, attrs)
+                parts = _iter_lines(ins)
+                part = next(parts)
+                for nxt in parts:
+                    add_inline(part, attrs)
                     emit_block(line_buf, {})
                     line_buf = ""
-                line_buf += _wrap_inline(parts[-1], attrs)
+                    part = nxt
+                    yield from flow; flow.clear()
+                add_inline(part, attrs)
             else:
-                line_buf += _wrap_inline(ins, attrs)
+                add_inline(ins, attrs)
         elif ins == '\n':
             emit_block(line_buf, attrs); line_buf = ""
         else:
             # (images/mentions could be handled here if needed)
             pass
+        yield from flow; flow.clear()
 
     if line_buf.strip():
         emit_block(line_buf, {})
     flush_bullets()
-    flow.append(Spacer(1, 4))
-    return flow
+    flow.append(Space(4))
+    yield from flow
 
 # --- Minimal Markdown (for task.description / task.markdown_description) ---
-def _render_markdown(md_text: str, styles) -> List[Any]:
+def _render_markdown(md_text: str, inline: Callable[[str], str] = md_inline_to_html) -> Iterator[Block]:
     """
     Very small MD renderer:
       - Headings: #, ##, ###
       - Bullets: lines starting with "- " or "* "
-      - Inline: md_inline_to_html() (**bold**, [link](url)); bare text → escaped
+      - Inline: md_inline_to_html() (**bold**, *italic*, [link](url), bare/task URLs); rest → escaped
       - Blank lines → spacing
     """
     if not md_text:
-        return []
-    flow: List[Any] = []
-    lines = md_text.replace('\r\n', '\n').split('\n')
+        return
     bullets: List[str] = []
 
     def flush_bullets():
         nonlocal bullets
         if not bullets:
-            return
-        items = [ListItem(Paragraph(md_inline_to_html(x), styles['body'])) for x in bullets]
-        flow.append(ListFlowable(items, bulletType='bullet', start='•', leftIndent=16))
+            return []
+        out = [Bullets([inline(x) for x in bullets])]
         bullets = []
+        return out
 
-    for raw in lines:
+    for raw in _iter_lines(md_text.replace('\r\n', '\n')):
         line = raw.rstrip()
 
         # headings
         if line.startswith('### '):
-            flush_bullets()
-            flow.append(Paragraph(md_inline_to_html(line[4:]), styles['h3']))
+            yield from flush_bullets()
+            yield Para(inline(line[4:]), 'h3')
             continue
         if line.startswith('## '):
-            flush_bullets()
-            flow.append(Paragraph(md_inline_to_html(line[3:]), styles['h2']))
+            yield from flush_bullets()
+            yield Para(inline(line[3:]), 'h2')
             continue
         if line.startswith('# '):
-            flush_bullets()
-            flow.append(Paragraph(md_inline_to_html(line[2:]), styles['h1']))
+            yield from flush_bullets()
+            yield Para(inline(line[2:]), 'h1')
             continue
 
         # bullets
         ls = line.lstrip()
         if ls.startswith('- ') or ls.startswith('* '):
             bullets.append(ls[2:].strip())
+            if len(bullets) >= MAX_LIST_ITEMS:
+                yield from flush_bullets()
             continue
 
         # blank line
         if line.strip() == '':
-            flush_bullets()
-            flow.append(Spacer(1, 4))
+            yield from flush_bullets()
+            yield Space(4)
             continue
 
         # paragraph
-        flush_bullets()
-        flow.append(Paragraph(md_inline_to_html(line), styles['body']))
+        yield from flush_bullets()
+        for chunk in _split_text(line):
+            yield Para(inline(chunk))
 
-    flush_bullets()
-    flow.append(Spacer(1, 6))
-    return flow
+    yield from flush_bullets()
+    yield Space(6)
 
-def _render_plain_with_md(story, text: str, styles):
+def _render_plain_with_md(text: str, inline: Callable[[str], str] = md_inline_to_html) -> Iterator[Block]:
     """
     Fallback renderer for plain text fields that contain lightweight markdown.
     - Preserves blank lines as paragraph breaks.
     - Supports **bold** and [text](url).
     """
-    blocks = []
-    raw_blocks = text.replace('\r\n', '\n').split('\n\n')
-    for blk in raw_blocks:
-        lines = [ln for ln in blk.split('\n')]
-        if len(lines) == 1:
-            blocks.append(lines[0])
-        else:
-            blocks.extend(lines)
-        blocks.append('')
-    if blocks and blocks[-1] == '':
-        blocks.pop()
-
-    for para in blocks:
+    for para in _iter_lines(text.replace('\r\n', '\n')):
         if para.strip():
-            story.append(Paragraph(md_inline_to_html(para.strip()), styles['body']))
+            for chunk in _split_text(para.strip()):
+                yield Para(inline(chunk))
         else:
-            story.append(Spacer(1, 4))
-    story.append(Spacer(1, 2))
+            yield Space(4)
+    yield Space(2)
 
-def add_title_and_meta(story, task, styles):
+def add_title_and_meta(task) -> Iterator[Block]:
     title = task.get('name') or 'ClickUp Task'
     url = task.get('url')
-    story.append(Paragraph(esc(title), styles['h1']))
+    yield Para(esc(title), 'h1')
     if url:
-        story.append(Paragraph(f'<a href="{esc(url)}">{esc(url)}</a>', styles['link']))
+        yield Para(link_html(url, esc(url)), 'link')
 
     # Owner (if present)
     owner_field = next((f for f in task.get('custom_fields', []) if f.get('name') == 'Owner of this VE'), None)
@@ -179,25 +247,21 @@ def add_title_and_meta(story, task, styles):
         owner = owner_field['value'][0].get('name', '')
         owner_url = owner_field['value'][0].get('url')
         if owner:
-            if owner_url:
-                story.append(Paragraph(f"<b>Owner:</b> <a href=\"{esc(owner_url)}\">{esc(owner)}</a>", styles['meta']))
-            else:
-                story.append(Paragraph(f"<b>Owner:</b> {esc(owner)}", styles['meta']))
-    story.append(Spacer(1, 8))
+            yield Para(f"<b>Owner:</b> {link_html(owner_url, esc(owner))}", 'meta')
+    yield Space(8)
 
-def render_url_field(story, field: Dict[str, Any], styles, label: str = None):
+def render_url_field(field: Dict[str, Any], label: str = None) -> Iterator[Block]:
     if not field or not field.get('value'):
         return
     url = str(field.get('value'))
     label = label or field.get('name') or 'Link'
-    story.append(Paragraph(esc(label), styles['h2']))
-    story.append(Paragraph(f'<a href="{esc(url)}">{esc(url)}</a>', styles['link']))
-    story.append(Spacer(1, 6))
+    yield Para(esc(label), 'h2')
+    yield Para(link_html(url, esc(url)), 'link')
+    yield Space(6)
 
-def render_relationship_field(story, field: Dict[str, Any], styles, level=3):
+def render_relationship_field(field: Dict[str, Any], level=3) -> Iterator[Block]:
     name = field.get('name', 'Related')
-    hdr_style = styles['h2'] if level == 2 else styles['h3']
-    story.append(Paragraph(esc(name), hdr_style))
+    yield Para(esc(name), 'h2' if level == 2 else 'h3')
 
     vals = field.get('value')
     if isinstance(vals, list) and len(vals) > 0:
@@ -206,16 +270,21 @@ def render_relationship_field(story, field: Dict[str, Any], styles, level=3):
             nm = it.get('name') or it.get('custom_id') or it.get('id')
             url = it.get('url')
             if nm:
-                if url:
-                    items.append(ListItem(Paragraph(f'<a href="{esc(url)}">{esc(nm)}</a>', styles['body'])))
-                else:
-                    items.append(ListItem(Paragraph(esc(nm), styles['body'])))
-        story.append(ListFlowable(items, bulletType='bullet', start='•', leftIndent=16) if items else Paragraph('—', styles['body']))
+                items.append(link_html(url, esc(nm)))
+        if items:
+            yield from _bullet_chunks(items)
+        else:
+            yield Para('—')
     else:
-        story.append(Paragraph('not completed – please think about this', styles['warn']))
-    story.append(Spacer(1, 6))
-
-def add_field_rich_or_plain(story, field: Dict[str, Any], styles, level=2):
+        yield Para('not completed – please think about this', 'warn')
+    yield Space(6)
+
+def add_field_rich_or_plain(
+    field: Dict[str, Any],
+    level=2,
+    inline: Callable[[str], str] = md_inline_to_html,
+    urlify: Callable[[str], str] = urlify_text,
+) -> Iterator[Block]:
     name = field.get('name', 'Text')
     rich = field.get('value_richtext') or ''
     plain = field.get('value') or ''
@@ -223,43 +292,172 @@ def add_field_rich_or_plain(story, field: Dict[str, Any], styles, level=2):
     if not rich and not plain:
         return
 
-    hdr_style = styles['h2'] if level == 2 else styles['h3']
-    story.append(Paragraph(esc(name), hdr_style)); story.append(Spacer(1, 2))
+    yield Para(esc(name), 'h2' if level == 2 else 'h3')
+    yield Space(2)
 
     if rich:
-        try:
-            delta = json.loads(rich)
-            ops = delta.get('ops', [])
-            story.extend(quill_to_flowables(ops, styles))
+        if len(rich) > STREAM_OPS_ABOVE and _OPS_START_RE.match(rich):
+            # Broken JSON falls back to plain text here too, as with json.loads below
+            ops = _iter_quill_ops(rich) if _quill_ops_ok(rich) else None
+        else:
+            try:
+                ops = json.loads(rich).get('ops', [])
+            except Exception:
+                ops = None
+        if ops is not None:
+            yield from quill_to_blocks(ops, urlify)
             return
-        except Exception:
-            pass
 
     # Plain fallback with minimal markdown support
-    _render_plain_with_md(story, plain, styles)
+    yield from _render_plain_with_md(plain, inline)
+
+def _fmt_ms(ms) -> str:
+    """ClickUp timestamps are epoch milliseconds (as strings)."""
+    try:
+        return datetime.fromtimestamp(int(ms) / 1000, tz=timezone.utc).strftime('%Y-%m-%d %H:%M UTC')
+    except (TypeError, ValueError):
+        return ''
+
+def comment_ops(comment: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """ClickUp comment blocks are Quill-like ({"text", "attributes"}); map them to Delta ops."""
+    ops = []
+    for blk in comment.get('comment') or []:
+        text = blk.get('text')
+        if isinstance(text, str) and text:
+            ops.append({'insert': text, 'attributes': blk.get('attributes') or {}})
+    if ops and not ops[-1]['insert'].endswith('\n'):
+        ops.append({'insert': '\n'})
+    return ops
+
+def _render_comment(comment: Dict[str, Any]) -> Iterator[Block]:
+    who = esc(comment.get('user') or 'Unknown')
+    when = _fmt_ms(comment.get('date'))
+    yield Para(f"<b>{who}</b> · {esc(when)}" if when else f"<b>{who}</b>", 'meta')
+    yield from quill_to_blocks(comment_ops(comment))
+
+def add_comments(task: Dict[str, Any]) -> Iterator[Block]:
+    comments = task.get('comments')
+    if comments is None:
+        return
+    yield Para(f'Comments ({len(comments)})', 'h2')
+    yield Space(2)
+    if not comments:
+        yield Para('No comments.', 'meta')
+    for c in comments:
+        yield from _render_comment(c)
+        replies = c.get('replies') or []
+        if replies:
+            yield Indent(16)
+            for r in replies:
+                yield from _render_comment(r)
+            yield Indent(-16)
+    yield Space(6)
+
+def add_status_history(task: Dict[str, Any]) -> Iterator[Block]:
+    history = task.get('status_history')
+    if not history:
+        return
+    yield Para('Status history', 'h2')
+    yield Space(2)
+    items = []
+    for h in history:
+        status = esc(str(h.get('status') or '—'))
+        since = _fmt_ms((h.get('total_time') or {}).get('since'))
+        minutes = (h.get('total_time') or {}).get('by_minute')
+        detail = ', '.join(x for x in (f"since {since}" if since else '', f"{minutes} min" if minutes is not None else '') if x)
+        items.append(f"<b>{status}</b>" + (f" ({esc(detail)})" if detail else ''))
+    yield from _bullet_chunks(items)
+    yield Space(6)
+
+def _fmt_size(size) -> str:
+    try:
+        n = float(size)
+    except (TypeError, ValueError):
+        return ''
+    for unit in ('B', 'KB', 'MB', 'GB'):
+        if n < 1024 or unit == 'GB':
+            return f"{n:.0f} {unit}" if unit == 'B' else f"{n:.1f} {unit}"
+        n /= 1024
+
+def add_attachments(
+    task: Dict[str, Any],
+    files: Optional[Dict[str, Path]] = None,
+    bundle: Optional[str] = None,
+) -> Iterator[Block]:
+    """
+    Attachments section. Attachments found in files (keyed by attachment id,
+    else URL) are embedded; the rest are listed as links to ClickUp. bundle
+    names a zip written next to the output that holds all of them.
+    """
+    atts = task.get('attachments') or []
+    if not atts:
+        return
+    yield Space(8)
+    yield Para(f'Attachments ({len(atts)})', 'h2')
+    yield Space(2)
+    if bundle:
+        yield Para(f'All files are in {link_html(quote(bundle), esc(bundle))}.', 'meta')
+    for a in atts:
+        name = (a.get('title') or '').strip() or str(a.get('id') or 'attachment')
+        path = (files or {}).get(a.get('id') or a.get('url'))
+        if path:
+            yield Attachment(Path(path), name, a.get('mimetype') or '')
+            continue
+        size = _fmt_size(a.get('size'))
+        label = esc(name) + (f" ({size})" if size else '')
+        url = a.get('url')
+        yield Para(link_html(url, label), 'link')
+    yield Space(6)
+
+def _task_lookup(task: Dict[str, Any]) -> TaskLookup:
+    """Index the task and its related tasks by id and custom id → (custom_id, name)."""
+    lookup: TaskLookup = {}
+    for it in [task] + [v for f in task.get('custom_fields', []) if isinstance(f.get('value'), list)
+                        for v in f['value'] if isinstance(v, dict)]:
+        tid, cid = it.get('id'), it.get('custom_id')
+        for key in (tid, cid):
+            if key:
+                lookup[key] = (cid or tid, it.get('name') or '')
+    return lookup
+
+def iter_document(
+    task: Dict[str, Any],
+    local_links: Optional[Dict[str, str]] = None,
+    attachments: Optional[Dict[str, Path]] = None,
+    bundle: Optional[str] = None,
+) -> Iterator[Block]:
+    """
+    Backend-neutral document for a task (see pdf_generator.document), block by block.
+    local_links maps task ids/custom ids to local files (e.g. sibling PDFs of a
+    batch); references to those tasks then link there instead of to ClickUp.
+    attachments (local files by attachment id, may be empty) and bundle enable
+    the Attachments section; see add_attachments.
+    """
+    lookup = _task_lookup(task)
+    inline = partial(md_inline_to_html, task_lookup=lookup, local_links=local_links)
+    urlify = partial(urlify_text, task_lookup=lookup, local_links=local_links)
 
-def build_story(task: Dict[str, Any]):
-    styles = build_styles()
-    story = []
-    add_title_and_meta(story, task, styles)
+    yield from add_title_and_meta(task)
 
     # --- Description (prefer markdown_description, fallback to description) ---
     md_desc = task.get('markdown_description') or ''
     plain_desc = task.get('description') or ''
     if md_desc or plain_desc:
-        story.append(Paragraph('Description', styles['h2'])); story.append(Spacer(1, 2))
+        yield Para('Description', 'h2')
+        yield Space(2)
         if md_desc:
-            story.extend(_render_markdown(md_desc, styles))
+            yield from _render_markdown(md_desc, inline)
         else:
-            _render_plain_with_md(story, plain_desc, styles)
+            yield from _render_plain_with_md(plain_desc, inline)
 
     # Verbatim (Fathom) link if present
     fields = task.get('custom_fields', [])
     by_name = {f.get('name'): f for f in fields}
-    render_url_field(story, by_name.get('AI Recording URL'), styles, label='Verbatim recording')
+    yield from render_url_field(by_name.get('AI Recording URL'), label='Verbatim recording')
 
     # Related section (shows red warning if empty)
-    story.append(Paragraph('Related', styles['h2'])); story.append(Spacer(1, 2))
+    yield Para('Related', 'h2')
+    yield Space(2)
     related_order = [
         'Owner of this VE',
         'Contributors to this value exchange',
@@ -270,33 +468,33 @@ def build_story(task: Dict[str, Any]):
     for rname in related_order:
         f = by_name.get(rname)
         if f:
-            render_relationship_field(story, f, styles, level=3)
+            yield from render_relationship_field(f, level=3)
 
 
     # Checklists
     cl = task.get('checklists') or []
     if cl:
-        story.append(Spacer(1, 8))
-        story.append(Paragraph('Checklists', styles['h2']))
-        story.append(Spacer(1, 2))
+        yield Space(8)
+        yield Para('Checklists', 'h2')
+        yield Space(2)
         for clist in cl:
             items = clist.get('items') or []
             # Always show the checklist name; even if empty, note it.
-            title = clist.get('name') or 'Checklist'
+            title = esc(clist.get('name') or 'Checklist')
             resolved = clist.get('resolved') or 0
             unresolved = clist.get('unresolved') or 0
             subtitle = f"{title} ({resolved}/{resolved+unresolved} done)" if (resolved or unresolved) else title
-            story.append(Paragraph(subtitle, styles['h3']))
+            yield Para(subtitle, 'h3')
             if items:
                 bullets = []
                 for it in items:
                     mark = '[x]' if it.get('resolved') else '[ ]'
                     txt = esc(it.get('name') or '')
-                    bullets.append(ListItem(Paragraph(f"{mark} {txt}", styles['body'])))
-                story.append(ListFlowable(bullets, bulletType='bullet', start='•', leftIndent=18))
+                    bullets.append(f"{mark} {txt}")
+                yield from _bullet_chunks(bullets, 18)
             else:
-                story.append(Paragraph('No items.', styles['warn']))
-            story.append(Spacer(1, 6))
+                yield Para('No items.', 'warn')
+            yield Space(6)
     # Main rich/plain text sections
     preferred = [
         'AI Summary',
@@ -311,11 +509,26 @@ def build_story(task: Dict[str, Any]):
     for name in preferred:
         f = by_name.get(name)
         if f and f.get('type') == 'text':
-            add_field_rich_or_plain(story, f, styles, level=2)
+            yield from add_field_rich_or_plain(f, level=2, inline=inline, urlify=urlify)
             printed.add(name)
 
     for f in fields:
         if f.get('type') == 'text' and f.get('name') not in printed:
-            add_field_rich_or_plain(story, f, styles, level=2)
+            yield from add_field_rich_or_plain(f, level=2, inline=inline, urlify=urlify)
 
-    return story
+    # Activity (only present when fetched with --with-comments)
+    yield from add_status_history(task)
+    yield from add_comments(task)
+
+    if attachments is not None or bundle:
+        yield from add_attachments(task, attachments, bundle)
+
+def build_document(task: Dict[str, Any], local_links: Optional[Dict[str, str]] = None) -> List[Block]:
+    """Backend-neutral document for a task, materialised (prefer iter_document for big tasks)."""
+    return list(iter_document(task, local_links))
+
+def build_story(task: Dict[str, Any]):
+    """ReportLab flowables for a task (the PDF backend's view of build_document)."""
+    from pdf_generator.backends.pdf_backend import iter_flowables
+    from pdf_generator.styles import build_styles
+    return list(iter_flowables(iter_document(task), build_styles()))
@@ -1,29 +1,87 @@
 # styles.py
-from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
+from pathlib import Path
+from typing import Dict, Optional
 
 BLUE = "#1f6feb"  # pleasant blue
 RED = "#c62828"   # warning red
 
-def build_styles():
+# TrueType family used when fonts must be embedded (e.g. for PDF/A archiving)
+EMBED_FAMILY = "DejaVuSans"
+FONT_DIRS = (
+    "/usr/share/fonts/truetype/dejavu",
+    "/usr/share/fonts/dejavu",
+    "/usr/share/fonts/TTF",
+    "/Library/Fonts",
+    "C:/Windows/Fonts",
+)
+
+def register_embedded_fonts(font_dir: Optional[str] = None, family: str = EMBED_FAMILY) -> Dict[str, str]:
+    """
+    Register a TrueType family (<family>.ttf, -Bold, -Oblique, -BoldOblique)
+    in place of the built-in Helvetica, which is never embedded. ReportLab
+    embeds TrueType fonts as subsets holding only the glyphs used.
+    Returns the Helvetica name -> registered name map for build_styles().
+    Raises FileNotFoundError if <family>.ttf is in none of the directories,
+    ValueError if a font file cannot be loaded.
+    """
+    from reportlab.pdfbase import pdfmetrics
+    from reportlab.pdfbase.ttfonts import TTFont
+    from reportlab.lib.fonts import addMapping
+
+    dirs = [font_dir] if font_dir else list(FONT_DIRS)
+    root = next((Path(d) for d in dirs if (Path(d) / f"{family}.ttf").exists()), None)
+    if root is None:
+        raise FileNotFoundError(f"No {family}.ttf found in {', '.join(dirs)}. Pass a directory containing it.")
+
+    names = {}
+    for base, suffix in (('Helvetica', ''), ('Helvetica-Bold', '-Bold'),
+                         ('Helvetica-Oblique', '-Oblique'), ('Helvetica-BoldOblique', '-BoldOblique')):
+        path = root / f"{family}{suffix}.ttf"
+        if path.exists():
+            name = f"{family}{suffix}"
+            if name not in pdfmetrics.getRegisteredFontNames():
+                try:
+                    pdfmetrics.registerFont(TTFont(name, str(path)))
+                except Exception as e:  # ReportLab's TTFError, or struct errors on truncated files
+                    raise ValueError(f"Cannot load font {path}: {e}") from e
+            names[base] = name
+    # Missing styles fall back to the closest available face
+    names.setdefault('Helvetica-Bold', names['Helvetica'])
+    names.setdefault('Helvetica-Oblique', names['Helvetica'])
+    names.setdefault('Helvetica-BoldOblique', names['Helvetica-Bold'])
+    # <b>/<i> inside paragraphs resolve through the family mapping
+    for bold, italic, base in ((0, 0, 'Helvetica'), (1, 0, 'Helvetica-Bold'),
+                               (0, 1, 'Helvetica-Oblique'), (1, 1, 'Helvetica-BoldOblique')):
+        addMapping(names['Helvetica'], bold, italic, names[base])
+    return names
+
+def build_styles(fonts: Optional[Dict[str, str]] = None):
+    """Paragraph styles by document style name; fonts maps Helvetica faces to replacements."""
+    # Imported here so non-PDF backends can share the palette without loading ReportLab
+    from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
+
+    def font(name: str) -> str:
+        return (fonts or {}).get(name, name)
+
     ss = getSampleStyleSheet()
 
     body = ParagraphStyle(
         'Body', parent=ss['BodyText'],
-        fontName='Helvetica', fontSize=10.5, leading=14, spaceAfter=4,
+        fontName=font('Helvetica'), fontSize=10.5, leading=14, spaceAfter=4,
     )
     h1 = ParagraphStyle(
         'H1', parent=ss['Heading1'],
-        fontName='Helvetica-Bold', fontSize=20, leading=24,
+        fontName=font('Helvetica-Bold'), fontSize=20, leading=24,
         textColor=BLUE, spaceBefore=10, spaceAfter=6,
     )
     h2 = ParagraphStyle(
         'H2', parent=ss['Heading2'],
-        fontName='Helvetica-Bold', fontSize=16, leading=20,
+        fontName=font('Helvetica-Bold'), fontSize=16, leading=20,
         textColor=BLUE, spaceBefore=10, spaceAfter=4,
     )
     h3 = ParagraphStyle(
         'H3', parent=ss['Heading3'],
-        fontName='Helvetica-Bold', fontSize=13, leading=17,
+        fontName=font('Helvetica-Bold'), fontSize=13, leading=17,
         textColor=BLUE, spaceBefore=8, spaceAfter=3,
     )
     meta = ParagraphStyle(
@@ -33,6 +91,6 @@ def build_styles():
     link = ParagraphStyle('Link', parent=meta, textColor=BLUE)
     warn = ParagraphStyle(
         'Warn', parent=body, textColor=RED,
-        fontName='Helvetica-Oblique', spaceAfter=3,
+        fontName=font('Helvetica-Oblique'), spaceAfter=3,
     )
     return {'body': body, 'h1': h1, 'h2': h2, 'h3': h3, 'meta': meta, 'link': link, 'warn': warn}
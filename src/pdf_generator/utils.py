@@ -1,9 +1,32 @@
 # utils.py
 import re
+from functools import lru_cache
+from typing import Dict, Optional, Tuple
 
 def esc(s: str) -> str:
-    """Escape for ReportLab Paragraph (mini HTML subset)."""
-    return s.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+    """Escape for ReportLab Paragraph (mini HTML subset) and HTML text/attribute values."""
+    return s.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;").replace('"', "&quot;")
+
+# --- Link targets ---
+# Only these schemes (and relative targets) become links; javascript:, data:,
+# file: and the like are rendered as text. Browsers ignore tabs/newlines in
+# URLs and leading control characters, so those are dropped before the check.
+SAFE_SCHEMES = ("http", "https", "mailto")
+_SCHEME_RE = re.compile(r"([A-Za-z][A-Za-z0-9+.\-]*):")
+_URL_IGNORED_RE = re.compile(r"[\t\n\r]|^[\x00-\x20]+")
+
+def is_safe_href(url: str) -> bool:
+    """True for http(s)/mailto URLs and relative targets (escaped or not)."""
+    if url.startswith(("https://", "http://")):
+        return True
+    m = _SCHEME_RE.match(_URL_IGNORED_RE.sub("", url))
+    return not m or m.group(1).lower() in SAFE_SCHEMES
+
+def link_html(url: Optional[str], label_html: str) -> str:
+    """<a href="url">label_html</a>, or just label_html when url is empty or not a safe target."""
+    if not url or not is_safe_href(str(url)):
+        return label_html
+    return f'<a href="{esc(str(url))}">{label_html}</a>'
 
 def coalesce_list_attr(list_attr):
     """ClickUp sometimes exports {"list": "bullet"}; normalize to 'bullet'."""
@@ -11,21 +34,120 @@ def coalesce_list_attr(list_attr):
         return list_attr.get('list')
     return list_attr
 
-# --- Minimal Markdown fallback for plain text fields ---
-_bold_re = re.compile(r"\*\*(.+?)\*\*")          # **bold**
-_link_re = re.compile(r"\[([^\]]+)\]\(([^)]+)\)") # [text](url)
+# --- ClickUp task references ---
+# /t/<task_id>, /t/<team>/<CUSTOM-ID>; group(1) is the task key
+TASK_ANY_URL_RE = re.compile(r"https?://(?:app\.)?clickup\.com/t/(?:\d+/)?([^/?#\s)\]]+)", re.I)
+# "[<key>] ClickUp Task" placeholders left by ClickUp exports
+TASK_BRACKET_RE = re.compile(r"\[([A-Za-z0-9_-]+)\]\s*ClickUp Task")
+
+TaskLookup = Dict[str, Tuple[str, str]]  # key (id or custom id) -> (custom_id, name)
+
+def task_button(key: str, href: str, task_lookup: Optional[TaskLookup] = None) -> str:
+    """Button-like inline link for a task: <b>[CUSTOM-ID]</b> Name."""
+    return _button(key, esc(href), task_lookup)
+
+# --- Single-pass inline scanner ---
+# The input is escaped once up front; a single alternation then finds markdown
+# links, "[id] ClickUp Task" placeholders, **bold**, *italic* and bare URLs in
+# one pass over the escaped text, so matched groups never need re-escaping.
+# Every branch starts with a literal ('[', '*' or 'h'), never with a group, so
+# the regex engine skips plain text with its first-character check instead of
+# trying the whole alternation at every position. URLs stop at escaped '<',
+# '>' and '"' and never end in trailing punctuation.
+# Matches are rewritten by re.sub with a callback, which is much cheaper than
+# a Python loop over finditer.
+_URL_REST = r"//[^\s<>\"'\[\]()&]*(?:&(?!lt;|gt;|quot;)[^\s<>\"'\[\]()&]*)*(?<![.,;:!?])"
+_EMPHASIS = (
+    r"\*(?:\*(?P<bold>.+?)\*\*"                                        # **bold**
+    r"|(?<![\w*]\*)(?P<ital>[^\s*](?:[^*\n]*?[^\s*])?)\*(?![\w*]))"     # *italic*
+)
+_URLS = r"https?:(?P<url>" + _URL_REST + r")"                          # bare http(s) URL
+_MD_INLINE_RE = re.compile(
+    r"\[(?:(?P<ltext>[^\]\n]+)\]\((?P<lurl>[^)\s]+)\)"                 # [text](url)
+    r"|(?P<tkey>[A-Za-z0-9_-]+)\]\s*ClickUp Task)"                      # [id] ClickUp Task
+    r"|" + _EMPHASIS + r"|" + _URLS
+)
+_EMPHASIS_RE = re.compile(_EMPHASIS)  # inside link labels: no nested links
+_URL_ONLY_RE = re.compile(_URLS)
+_TASK_URL_PREFIX = "clickup.com/t/"
+
+@lru_cache(maxsize=4096)
+def _button_label(cid: str, name: str) -> str:
+    return f'<b>[{esc(cid)}]</b> {esc(name or "ClickUp Task")}'
+
+def _button(key: str, href_html: str, task_lookup: Optional[TaskLookup]) -> str:
+    cid, name = (task_lookup or {}).get(key, (key, ""))
+    return f'<a href="{href_html}">{_button_label(cid, name)}</a>'
+
+def _link(url: str, label: str, task_lookup, local_links, button: bool = True) -> str:
+    """
+    Link for an escaped url/label; a task button (or local anchor) when url
+    points at a ClickUp task.
+    """
+    m = TASK_ANY_URL_RE.match(url) if _TASK_URL_PREFIX in url else None
+    if m:
+        key = m.group(1)
+        local = (local_links or {}).get(key)
+        href = esc(local) if local else url
+        if button:
+            return _button(key, href, task_lookup)
+        return f'<a href="{href}">{label}</a>'
+    return f'<a href="{url}">{label}</a>'
+
+def _rewriter(task_lookup: Optional[TaskLookup], local_links: Optional[Dict[str, str]]):
+    """re.sub callback for the scanner regexes, bound to one task_lookup/local_links."""
+
+    def repl(m) -> str:
+        kind = m.lastgroup
+        if kind == 'url':
+            url = m.group()
+            if _TASK_URL_PREFIX in url:
+                return _link(url, url, task_lookup, local_links)
+            return f'<a href="{url}">{url}</a>'
+        if kind == 'bold' or kind == 'ital':
+            inner = m.group(kind)
+            if '*' in inner or '[' in inner or '://' in inner:
+                inner = m.re.sub(repl, inner)
+            return f"<b>{inner}</b>" if kind == 'bold' else f"<i>{inner}</i>"
+        if kind == 'lurl':
+            url = m.group('lurl')
+            if not is_safe_href(url):
+                return m.group(0)  # e.g. [x](javascript:...) stays literal text
+            label = m.group('ltext')
+            if '*' in label:
+                label = _EMPHASIS_RE.sub(repl, label)
+            return _link(url, label, task_lookup, local_links, button=False)
+        key = m.group('tkey')
+        local = (local_links or {}).get(key)
+        return _button(key, esc(local) if local else f"https://app.clickup.com/t/{key}", task_lookup)
+
+    return repl
 
-def md_inline_to_html(s: str) -> str:
+_plain_rewriter = _rewriter(None, None)
+
+def md_inline_to_html(s: str, task_lookup: Optional[TaskLookup] = None, local_links: Optional[Dict[str, str]] = None) -> str:
     """
     Convert a tiny subset of Markdown to the HTML subset ReportLab understands.
-    - **bold** -> <b>…</b>
+    - **bold** -> <b>…</b>, *italic* -> <i>…</i> (also inside link labels)
     - [text](url) -> <a href="url">text</a>
-    Escape everything else first.
+    - bare URLs -> links; ClickUp task URLs and "[id] ClickUp Task" -> task buttons
+      (pointing at local_links[key] when the task is rendered alongside)
+    Everything else is escaped, once.
     """
     if not s:
         return ""
+    # Fast path: most lines have no markup (plain `in` checks beat any regex here)
+    if '*' not in s and '[' not in s and '://' not in s:
+        return esc(s)
     t = esc(s)
-    # links first so inner **bold** in link text is handled next
-    t = _link_re.sub(lambda m: f'<a href="{esc(m.group(2))}">{esc(m.group(1))}</a>', t)
-    t = _bold_re.sub(lambda m: f"<b>{esc(m.group(1))}</b>", t)
-    return t
+    repl = _rewriter(task_lookup, local_links) if task_lookup or local_links else _plain_rewriter
+    return _MD_INLINE_RE.sub(repl, t)
+
+def urlify_text(s: str, task_lookup: Optional[TaskLookup] = None, local_links: Optional[Dict[str, str]] = None) -> str:
+    """Escape s and turn bare URLs (incl. ClickUp task URLs) into links; no Markdown."""
+    if not s:
+        return ""
+    if '://' not in s:
+        return esc(s)
+    repl = _rewriter(task_lookup, local_links) if task_lookup or local_links else _plain_rewriter
+    return _URL_ONLY_RE.sub(repl, esc(s))
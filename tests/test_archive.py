@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Output layouts, relative task links and the artifact index (cli.archive),
+including `make-pdfs find` through find_main.
+"""
+
+import json
+import hashlib
+import multiprocessing
+from datetime import datetime, timezone
+from pathlib import Path
+
+import pytest
+
+from cli.archive import ArchiveIndex, RelativeLinks, file_digest, find_main, shard_dir
+from cli.make_pdfs import LAYOUTS, next_sequence
+from pdf_generator.backends import get_backend
+from pdf_generator.document import Attachment, Para
+from pdf_generator.optimize import count_pages, optimize_pdf
+
+def _pdf(path, blocks):
+    get_backend("pdf").write(blocks, path, title="t")
+    return path
+
+def test_page_count_ignores_embedded_pdfs(tmp_path):
+    inner = _pdf(tmp_path / "inner.pdf", [Para(f"page {i}", "h1") for i in range(3)]
+                 + [Para("x<br/>" * 80, "body")])
+    inner_pages = file_digest(inner)["pages"]
+    assert inner_pages > 1
+
+    outer = _pdf(tmp_path / "outer.pdf", [Para("one page", "body"),
+                                          Attachment(inner, "inner.pdf", "application/pdf")])
+    assert file_digest(outer)["pages"] == 1
+    assert count_pages(optimize_pdf(outer.read_bytes())) == 1
+    assert count_pages(optimize_pdf(inner.read_bytes())) == inner_pages
+
+def test_page_count_of_non_pdf_bytes():
+    assert count_pages(b"not a pdf") is None
+    assert count_pages(b"%PDF-1.4\nstartxref\n999999\n%%EOF\n") is None
+
+TASK = {"id": "86abc", "custom_id": "PERSON-7", "team_id": "9012", "list": {"id": "901/x"}, "name": "Seven"}
+
+def test_shard_dir_for_each_layout():
+    now = datetime(2024, 3, 5, tzinfo=timezone.utc)
+    digest = hashlib.sha1(b"PERSON-7").hexdigest()
+    dirs = {layout: shard_dir(layout, "PERSON-7", TASK, now) for layout in LAYOUTS}
+    assert dirs == {
+        "flat": Path(), "team": Path("9012"), "list": Path("901_x"),
+        "date": Path("2024", "03"), "hash": Path(digest[:2], digest[2:4]),
+    }
+    assert shard_dir("hash", "PERSON-7", {}) == dirs["hash"]  # depends on the key only
+    assert shard_dir("team", "X", {}) == Path("no-team")
+    assert shard_dir("list", "X", {"list": None}) == Path("no-list")
+    with pytest.raises(ValueError, match="Unknown layout"):
+        shard_dir("nope", "X", TASK)
+
+def test_relative_links_between_shards(tmp_path):
+    targets = {"A-1": tmp_path / "3f" / "b4" / "0001 - A-1 Name.pdf", "A-2": tmp_path / "3f" / "b4" / "0002 - A-2.pdf"}
+    links = RelativeLinks(targets, tmp_path / "00" / "aa")
+    assert links.get("A-1") == "../../3f/b4/0001%20-%20A-1%20Name.pdf"
+    assert RelativeLinks(targets, tmp_path / "3f" / "b4").get("A-2") == "0002%20-%20A-2.pdf"
+    assert links.get("missing") is None and links.get("missing", "x") == "x"
+
+def test_reserve_seeds_once_then_hands_out_ranges(tmp_path):
+    index = ArchiveIndex(tmp_path)
+    seeds = []
+    assert index.reserve(3, seed=lambda: seeds.append(1) or 41) == 41
+    assert index.reserve(2, seed=lambda: seeds.append(1) or 1) == 44
+    assert index.reserve(1, seed=lambda: 1) == 46
+    assert seeds == [1]
+    index.close()
+    # A reopened index continues where it left off
+    reopened = ArchiveIndex(tmp_path)
+    assert reopened.reserve(1, seed=lambda: 1) == 47
+    reopened.close()
+
+def _reserve_many(outdir, queue):
+    index = ArchiveIndex(outdir)
+    queue.put([index.reserve(5, seed=lambda: 1) for _ in range(20)])
+    index.close()
+
+def test_concurrent_runs_never_share_numbers(tmp_path):
+    ctx = multiprocessing.get_context("fork")
+    queue = ctx.Queue()
+    runs = [ctx.Process(target=_reserve_many, args=(tmp_path, queue)) for _ in range(4)]
+    for p in runs:
+        p.start()
+    firsts = [n for _ in runs for n in queue.get(timeout=60)]
+    for p in runs:
+        p.join()
+    assert sorted(firsts) == list(range(1, 1 + 5 * 80, 5))
+
+def _write(outdir, rel, task, formats=("pdf",)):
+    base = outdir / rel
+    base.parent.mkdir(parents=True, exist_ok=True)
+    Path(f"{base}.json").write_text(json.dumps(task), encoding="utf-8")
+    for fmt in formats:
+        Path(f"{base}.{fmt}").write_text(f"{fmt} of {task.get('name')}", encoding="utf-8")
+    return base
+
+def test_find_by_key_id_and_custom_id(tmp_path):
+    index = ArchiveIndex(tmp_path)
+    for seq, name in ((1, "first"), (2, "second")):
+        base = _write(tmp_path, f"9012/000{seq} - PERSON-7", dict(TASK, name=name), ("pdf", "md"))
+        for fmt in ("pdf", "md"):
+            index.record(seq, "PERSON-7", TASK, fmt, Path(f"{base}.{fmt}"), Path(f"{base}.json"))
+
+    latest = index.find("PERSON-7")
+    assert [(r["seq"], r["path"]) for r in latest] == [(2, "9012/0002 - PERSON-7.md")]
+    assert index.find("86abc", "pdf")[0]["path"] == "9012/0002 - PERSON-7.pdf"
+    assert [r["seq"] for r in index.find("PERSON-7", "pdf", latest=False)] == [2, 1]
+    row = index.find("86abc", "md", latest=False)[-1]
+    assert (row["custom_id"], row["team_id"], row["list_id"], row["json_path"]) == (
+        "PERSON-7", "9012", "901/x", "9012/0001 - PERSON-7.json")
+    assert row["sha256"] == file_digest(tmp_path / row["path"])["sha256"]
+    assert index.find("PERSON-8") == []
+    index.close()
+
+def test_find_main_reindexes_a_flat_directory(tmp_path, capsys):
+    # Outputs written before the index existed
+    _write(tmp_path, "0003 - PERSON-7", TASK, ("pdf", "html"))
+    _write(tmp_path, "0004 - 86other", {"id": "86other", "name": "Other"})
+    _write(tmp_path, "0009 - PERSON-7", dict(TASK, name="Newer"))
+    (tmp_path / "notes.json").write_text("{}", encoding="utf-8")
+    (tmp_path / "0010 - broken.json").write_text("{not json", encoding="utf-8")
+
+    find_main(["--outputs", str(tmp_path), "--reindex"])
+    assert capsys.readouterr().out == "Indexed 4 existing file(s).\n"
+    find_main(["--outputs", str(tmp_path), "--reindex"])
+    assert capsys.readouterr().out == "Indexed 0 existing file(s).\n"
+
+    find_main(["--outputs", str(tmp_path), "https://app.clickup.com/t/9012/PERSON-7"])
+    assert capsys.readouterr().out.strip() == str(tmp_path.resolve() / "0009 - PERSON-7.pdf")
+    find_main(["--outputs", str(tmp_path), "86abc", "--format", "html"])
+    assert capsys.readouterr().out.strip() == str(tmp_path.resolve() / "0003 - PERSON-7.html")
+    find_main(["--outputs", str(tmp_path), "PERSON-7", "--all", "--json"])
+    assert [r["seq"] for r in json.loads(capsys.readouterr().out)] == [9, 3, 3]
+    find_main(["--outputs", str(tmp_path), "86other", "--all"])
+    assert capsys.readouterr().out.startswith("0004  ")
+
+    with pytest.raises(SystemExit, match="No generated files for PERSON-8"):
+        find_main(["--outputs", str(tmp_path), "PERSON-8"])
+
+    # Numbering continues after the highest indexed file
+    index = ArchiveIndex(tmp_path)
+    assert index.reserve(1, seed=lambda: next_sequence(tmp_path)) == 10
+    index.close()
+
+def test_find_main_without_outputs(tmp_path):
+    with pytest.raises(SystemExit, match="No outputs directory"):
+        find_main(["--outputs", str(tmp_path / "missing"), "PERSON-7"])
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Attachment downloads (api.attachments) against a local HTTP server.
+"""
+
+import os
+import time
+import zipfile
+import hashlib
+import threading
+import multiprocessing
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+from api.attachments import AttachmentCache, fetch_attachment, fetch_attachments, write_bundle
+
+BODY = bytes(range(256)) * 1024  # 256 KiB, several download chunks
+
+class _Files(BaseHTTPRequestHandler):
+    files = {}          # path -> bytes
+    requests = []       # (path, Range header or None)
+    honour_range = True
+    cut_once = set()    # paths whose first response stops halfway through the body
+    delay = 0.0
+
+    def do_GET(self):
+        cls = type(self)
+        rng = self.headers.get("Range")
+        cls.requests.append((self.path, rng))
+        time.sleep(cls.delay)
+        data = cls.files[self.path]
+        start = int(rng[len("bytes="):-1]) if rng and cls.honour_range else 0
+        self.send_response(206 if start else 200)
+        if start:
+            self.send_header("Content-Range", f"bytes {start}-{len(data) - 1}/{len(data)}")
+        self.send_header("Content-Length", str(len(data) - start))
+        self.end_headers()
+        if self.path in cls.cut_once:
+            cls.cut_once.discard(self.path)
+            self.wfile.write(data[start:start + len(data) // 2])
+            self.close_connection = True
+            return
+        self.wfile.write(data[start:])
+
+    def log_message(self, *args):
+        pass
+
+@pytest.fixture
+def server():
+    _Files.files = {"/a": BODY, "/b": BODY, "/c": b"other content"}
+    _Files.requests, _Files.honour_range, _Files.cut_once, _Files.delay = [], True, set(), 0.0
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), _Files)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{httpd.server_port}"
+    httpd.shutdown()
+    httpd.server_close()
+
+def _att(base, path, id_=None, title="file.bin"):
+    return {"id": id_ or path.strip("/"), "url": base + path, "title": title}
+
+def test_resumes_partial_download_with_range(tmp_path, server):
+    cache = AttachmentCache(tmp_path)
+    part = cache.partial_path("a")
+    part.parent.mkdir(parents=True)
+    part.write_bytes(BODY[:1000])
+
+    with requests.Session() as s:
+        path = fetch_attachment(_att(server, "/a"), cache, s)
+
+    assert path.read_bytes() == BODY
+    assert path.name == hashlib.sha256(BODY).hexdigest()
+    assert _Files.requests == [("/a", "bytes=1000-")]
+    assert not part.exists()
+
+def test_restarts_when_server_ignores_range(tmp_path, server):
+    _Files.honour_range = False
+    cache = AttachmentCache(tmp_path)
+    part = cache.partial_path("a")
+    part.parent.mkdir(parents=True)
+    part.write_bytes(b"stale bytes from another version")
+
+    with requests.Session() as s:
+        assert fetch_attachment(_att(server, "/a"), cache, s).read_bytes() == BODY
+    assert _Files.requests == [("/a", "bytes=32-")]
+
+def test_interrupted_download_is_retried_from_where_it_stopped(tmp_path, server):
+    _Files.cut_once = {"/a"}
+    cache = AttachmentCache(tmp_path)
+    with requests.Session() as s:
+        assert fetch_attachment(_att(server, "/a"), cache, s).read_bytes() == BODY
+    assert _Files.requests == [("/a", None), ("/a", f"bytes={len(BODY) // 2}-")]
+
+def test_cached_keys_are_never_downloaded_again(tmp_path, server):
+    atts = [_att(server, "/a", title="a.bin"), _att(server, "/c", title="c.txt")]
+    files, errors = fetch_attachments(atts + atts, AttachmentCache(tmp_path))
+    assert errors == [] and sorted(files) == ["a", "c"]
+    assert len(_Files.requests) == 2
+
+    # Another run sharing the cache directory
+    again, _ = fetch_attachments(atts, AttachmentCache(tmp_path))
+    assert again == files
+    assert len(_Files.requests) == 2
+
+def test_same_content_under_different_keys_is_stored_once(tmp_path, server):
+    files, _ = fetch_attachments([_att(server, "/a"), _att(server, "/b")], AttachmentCache(tmp_path))
+    assert files["a"] == files["b"]
+    assert [p.name for p in (tmp_path / "objects").rglob("*") if p.is_file()] == [hashlib.sha256(BODY).hexdigest()]
+    assert sorted(AttachmentCache(tmp_path)._read()) == ["a", "b"]
+
+def test_errors_are_reported_per_attachment(tmp_path, server):
+    files, errors = fetch_attachments([_att(server, "/a"), {"id": "x", "title": "no-url.txt"}],
+                                      AttachmentCache(tmp_path))
+    assert list(files) == ["a"]
+    assert errors == ["attachment no-url.txt -> Attachment 'no-url.txt' has no URL"]
+
+def _fetch_in_process(root, att):
+    with requests.Session() as s:
+        fetch_attachment(att, AttachmentCache(root), s)
+
+def test_processes_sharing_a_cache_download_once(tmp_path, server):
+    pytest.importorskip("fcntl")
+    _Files.delay = 0.3  # both processes wait on the lock while the first downloads
+    ctx = multiprocessing.get_context("fork")
+    procs = [ctx.Process(target=_fetch_in_process, args=(tmp_path, _att(server, "/a"))) for _ in range(3)]
+    for p in procs:
+        p.start()
+    for p in procs:
+        p.join()
+    assert [p.exitcode for p in procs] == [0, 0, 0]
+    assert _Files.requests == [("/a", None)]
+    assert AttachmentCache(tmp_path).get("a").read_bytes() == BODY
+    assert os.listdir(tmp_path / "partial") == [AttachmentCache(tmp_path).partial_path("a").with_suffix(".lock").name]
+
+def test_bundle_renames_duplicate_names(tmp_path):
+    a, b = tmp_path / "a", tmp_path / "b"
+    a.write_bytes(b"A")
+    b.write_bytes(b"B")
+    zip_path = write_bundle(tmp_path / "t.zip", [("notes 1.txt", a), ("notes 1.txt", b), ("../x.txt", a)])
+    with zipfile.ZipFile(zip_path) as z:
+        assert z.namelist() == ["notes_1.txt", "2_notes_1.txt", ".._x.txt"]
+        assert z.read("2_notes_1.txt") == b"B"
+    assert [p.name for p in tmp_path.iterdir() if p.suffix == ".tmp"] == []
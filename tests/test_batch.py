@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Directory spool used by `make-pdfs produce` / `make-pdfs work`.
+"""
+
+import os
+import time
+
+from cli.batch import Spool, work_loop
+
+TASK = {"id": "abc", "name": "Spool task", "custom_fields": []}
+
+def _envelope(seq):
+    return {"seq": seq, "key": "abc", "raw": "abc", "base": f"{seq:04d} - abc", "task": TASK}
+
+def test_heartbeat_keeps_claims_fresh(tmp_path):
+    spool = Spool(tmp_path)
+    spool.put(1, _envelope(1))
+    claimed = next(spool.claims())
+    os.utime(claimed, (0, 0))
+    with spool.heartbeat(claimed, 0.02):
+        time.sleep(0.2)
+    assert time.time() - claimed.stat().st_mtime < 5
+    assert spool.requeue_stale(60) == 0
+
+def test_worker_requeues_claims_of_dead_workers(tmp_path):
+    spool = Spool(tmp_path / "spool")
+    spool.put(1, _envelope(1))
+    spool.put(2, _envelope(2))
+    # A worker claimed item 1 and died: its claim is never touched again
+    orphan = spool.dir("claimed") / "00000001.json@gone-1"
+    os.rename(spool.dir("pending") / "00000001.json", orphan)
+    os.utime(orphan, (0, 0))
+
+    stats = work_loop(str(spool.root), str(tmp_path / "out"), use_index=False, wait=False, stale_after=60)
+
+    assert stats["done"] == 2
+    assert spool.counts() == {"pending": 0, "claimed": 0, "done": 2, "failed": 0}
+    assert (tmp_path / "out" / "0001 - abc.pdf").exists()
+
+def test_finish_after_requeue_is_ignored(tmp_path):
+    spool = Spool(tmp_path)
+    spool.put(1, _envelope(1))
+    claimed = next(spool.claims())
+    os.utime(claimed, (0, 0))
+    assert spool.requeue_stale(60) == 1
+    spool.finish(claimed)
+    assert spool.counts()["pending"] == 1
+
+def test_worker_drains_items_queued_just_before_producer_done(tmp_path, monkeypatch):
+    spool = Spool(tmp_path / "spool")
+    candidates = Spool._candidates
+    calls = []
+
+    def racing_producer(self):
+        # First pass finds pending/ empty; the producer then queues its last
+        # item and finishes before the worker looks at producer.done
+        calls.append(1)
+        if len(calls) == 1:
+            spool.put(1, _envelope(1))
+            spool.mark_producer(True)
+            return []
+        return candidates(self)
+
+    monkeypatch.setattr(Spool, "_candidates", racing_producer)
+    stats = work_loop(str(spool.root), str(tmp_path / "out"), use_index=False, wait=True, stale_after=60)
+
+    assert stats["done"] == 1
+    assert spool.counts()["pending"] == 0
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Comment threads and status history (fetch_task with_comments) against a local
+stand-in for the ClickUp API.
+"""
+
+import json
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+import requests
+
+import cli.make_pdfs as make_pdfs
+from pdf_generator.backends.html_backend import to_html
+from pdf_generator.renderers import iter_document
+
+COMMENTS = 60  # three pages of 25, 25 and 10
+PAGE = make_pdfs.COMMENT_PAGE_SIZE
+
+def _comment(i):
+    return {"id": f"c{i}", "date": str(1_700_000_000_000 + i * 60_000), "user": {"username": f"user{i}"},
+            "comment": [{"text": f"comment {i}"}], "reply_count": 2 if i % 4 == 0 else 0,
+            "reactions": [], "assignee": None}
+
+class _ClickUp(BaseHTTPRequestHandler):
+    pages = []    # query of each comment page request
+    active = 0    # reply requests being answered right now
+    peak = 0
+    lock = threading.Lock()
+
+    def _send(self, payload):
+        data = json.dumps(payload).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        q = {k: v[0] for k, v in parse_qs(url.query).items()}
+        parts = url.path.strip("/").split("/")
+        cls = type(self)
+        if parts[-1] == "comment":
+            cls.pages.append(q)
+            # Newest first; start/start_id continue below the oldest comment seen
+            start = int(q["start"]) if "start" in q else None
+            older = [c for c in map(_comment, reversed(range(COMMENTS))) if start is None or int(c["date"]) < start]
+            self._send({"comments": older[:PAGE]})
+        elif parts[-1] == "reply":
+            with cls.lock:
+                cls.active += 1
+                cls.peak = max(cls.peak, cls.active)
+            time.sleep(0.02)
+            with cls.lock:
+                cls.active -= 1
+            cid = parts[-2]
+            self._send({"comments": [{"id": f"{cid}-r{n}", "date": "1700000000000",
+                                      "user": {"username": "replier"}, "comment": [{"text": f"reply {n} to {cid}"}]}
+                                     for n in range(2)]})
+        elif parts[-1] == "time_in_status":
+            self._send({"status_history": [
+                {"status": "to do", "total_time": {"by_minute": 90, "since": "1700000000000"}},
+                {"status": "in <progress>", "total_time": {"by_minute": 5, "since": "1700005400000"}},
+            ]})
+        else:
+            self._send({"id": parts[-1], "name": "Task with comments", "custom_fields": []})
+
+    def log_message(self, *args):
+        pass
+
+@pytest.fixture
+def clickup(monkeypatch):
+    _ClickUp.pages, _ClickUp.active, _ClickUp.peak = [], 0, 0
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _ClickUp)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    monkeypatch.setattr(make_pdfs, "API_BASE", f"http://127.0.0.1:{server.server_port}")
+    with requests.Session() as session:
+        yield session
+    server.shutdown()
+    server.server_close()
+
+def test_comments_are_paged_oldest_first_with_replies(clickup, monkeypatch):
+    # Track reply futures submitted but not finished, to check the pending cap
+    submitted, pending_peak = [], [0]
+    real_submit = ThreadPoolExecutor.submit
+
+    def submit(self, *args, **kwargs):
+        f = real_submit(self, *args, **kwargs)
+        submitted.append(f)
+        pending_peak[0] = max(pending_peak[0], sum(1 for x in submitted if not x.done()))
+        return f
+
+    monkeypatch.setattr(ThreadPoolExecutor, "submit", submit)
+    task = make_pdfs.fetch_task("9001", None, api_key="pk", session=clickup, with_comments=True, max_in_flight=3)
+
+    comments = task["comments"]
+    assert [c["id"] for c in comments] == [f"c{i}" for i in range(COMMENTS)]
+    assert comments[0] == {"id": "c0", "user": "user0", "date": "1700000000000",
+                           "comment": [{"text": "comment 0"}], "replies": [
+                               {"id": "c0-r0", "user": "replier", "date": "1700000000000",
+                                "comment": [{"text": "reply 0 to c0"}]},
+                               {"id": "c0-r1", "user": "replier", "date": "1700000000000",
+                                "comment": [{"text": "reply 1 to c0"}]}]}
+    for i, c in enumerate(comments):
+        assert [r["comment"][0]["text"] for r in c.get("replies", [])] == (
+            [f"reply 0 to c{i}", f"reply 1 to c{i}"] if i % 4 == 0 else []
+        )
+
+    # Cursor paging: each page starts at the oldest comment of the previous one
+    assert [(p.get("start"), p.get("start_id")) for p in _ClickUp.pages] == [
+        (None, None), (_comment(COMMENTS - PAGE)["date"], f"c{COMMENTS - PAGE}"),
+        (_comment(COMMENTS - 2 * PAGE)["date"], f"c{COMMENTS - 2 * PAGE}"),
+    ]
+    assert 1 < _ClickUp.peak <= 3
+    assert len(submitted) == COMMENTS // 4
+    assert pending_peak[0] <= 2 * 3 + 1
+
+    assert [h["status"] for h in task["status_history"]] == ["to do", "in <progress>"]
+
+def test_comments_and_history_are_rendered(clickup):
+    task = make_pdfs.fetch_task("9001", None, api_key="pk", session=clickup, with_comments=True, max_in_flight=2)
+    html = to_html(iter_document(task))
+
+    assert f"Comments ({COMMENTS})" in html and "Status history" in html
+    assert "<b>in &lt;progress&gt;</b> (since 2023-11-14 23:43 UTC, 5 min)" in html
+    assert html.index("comment 0") < html.index("reply 1 to c0") < html.index("comment 1<") < html.index("comment 59")
+
+def test_without_comments_nothing_extra_is_fetched(clickup):
+    task = make_pdfs.fetch_task("9001", None, api_key="pk", session=clickup)
+    assert "comments" not in task and "status_history" not in task
+    assert _ClickUp.pages == []
@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Task text reaching the HTML and Markdown backends (and ReportLab) stays text.
+"""
+
+from pdf_generator.backends import get_backend
+from pdf_generator.backends.html_backend import to_html
+from pdf_generator.backends.markdown_backend import to_markdown
+from pdf_generator.renderers import iter_document
+
+TASK = {
+    "name": 'Test <task> & "quotes" *x* <script>alert(1)</script>',
+    "url": "javascript:alert(1)",
+    "markdown_description": (
+        '[y](http://a"onmouseover="alert) and [x](javascript:alert) '
+        "and [ok](https://x.com/?a=1&b=2) - 1. *b*"
+    ),
+    "custom_fields": [
+        {"name": "Notes", "type": "text", "value_richtext":
+            '{"ops": [{"insert": "click", "attributes": {"link": " java\\tscript:alert(1)"}}, {"insert": "\\n"}]}'},
+    ],
+    "checklists": [
+        {"name": "<img src=x onerror=alert(1)>", "resolved": 1, "unresolved": 1,
+         "items": [{"name": "<b>item</b>", "resolved": True}]},
+        {"name": "A & B <c", "items": []},
+    ],
+}
+
+def test_html_attributes_and_schemes():
+    html = to_html(iter_document(TASK))
+    assert "<script>" not in html
+    assert 'href="http://a&quot;onmouseover=&quot;alert"' in html
+    assert "href=\"javascript" not in html and "script:alert(1)\">" not in html
+    assert "[x](javascript:alert)" in html  # unsafe targets are left as text
+    assert '<a href="https://x.com/?a=1&amp;b=2">ok</a>' in html
+    assert "<img" not in html and "&lt;img src=x onerror=alert(1)&gt; (1/2 done)" in html
+    assert "A &amp; B &lt;c" in html and "[x] &lt;b&gt;item&lt;/b&gt;" in html
+
+def test_markdown_escapes_text():
+    md = to_markdown(iter_document(TASK))
+    assert r'# Test \<task\> & "quotes" \*x\* \<script\>alert(1)\</script\>' in md
+    assert "[ok](https://x.com/?a=1&b=2)" in md
+    assert r"\[x\](javascript:alert)" in md
+    assert "(javascript" not in md.replace(r"\[x\](javascript:alert)", "")
+    assert ") - 1. *b*" in md  # mid-line "-" and "1." need no escaping
+
+def test_pdf_renders_hostile_markup(tmp_path):
+    out = tmp_path / "t.pdf"
+    get_backend("pdf").write(iter_document(TASK), out, title=TASK["name"])
+    assert out.read_bytes().startswith(b"%PDF")
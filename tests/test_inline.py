@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Single-pass inline scanner (utils.md_inline_to_html / urlify_text).
+"""
+
+from pdf_generator.utils import md_inline_to_html, urlify_text
+
+LOOKUP = {"PERSON-3": ("PERSON-3", "Three & <co>")}
+LOCAL = {"PERSON-3": "0002 - PERSON-3.pdf"}
+
+def test_plain_text_is_only_escaped():
+    assert md_inline_to_html('a & b <c> "d"') == "a &amp; b &lt;c&gt; &quot;d&quot;"
+    assert md_inline_to_html("nothing to do") == "nothing to do"
+
+def test_emphasis_nests_in_link_labels():
+    assert md_inline_to_html("[a **b**](https://x.com)") == '<a href="https://x.com">a <b>b</b></a>'
+    assert md_inline_to_html("**[c](https://y.org)**") == '<b><a href="https://y.org">c</a></b>'
+
+def test_bare_urls():
+    assert md_inline_to_html("see https://x.com/p.") == 'see <a href="https://x.com/p">https://x.com/p</a>.'
+    assert md_inline_to_html("*at http://a.b/?q=1&r=2*") == (
+        '<i>at <a href="http://a.b/?q=1&amp;r=2">http://a.b/?q=1&amp;r=2</a></i>'
+    )
+
+def test_url_scheme_is_part_of_the_link():
+    assert urlify_text("see:https://x.com, xhttp://y.org") == (
+        'see:<a href="https://x.com">https://x.com</a>, x<a href="http://y.org">http://y.org</a>'
+    )
+    assert md_inline_to_html("**https://x.com/a** *http://y.org*") == (
+        '<b><a href="https://x.com/a">https://x.com/a</a></b> <i><a href="http://y.org">http://y.org</a></i>'
+    )
+
+def test_task_references():
+    button = '<a href="0002 - PERSON-3.pdf"><b>[PERSON-3]</b> Three &amp; &lt;co&gt;</a>'
+    assert md_inline_to_html("[PERSON-3] ClickUp Task", LOOKUP, LOCAL) == button
+    assert urlify_text("go https://app.clickup.com/t/9/PERSON-3.", LOOKUP, LOCAL) == f"go {button}."
+    assert md_inline_to_html("[PERSON-4] ClickUp Task") == (
+        '<a href="https://app.clickup.com/t/PERSON-4"><b>[PERSON-4]</b> ClickUp Task</a>'
+    )
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+optimize_pdf round trip: the smaller file must still be a valid PDF with the
+same pages and text.
+"""
+
+import io
+
+import pytest
+
+from pdf_generator.backends import get_backend
+from pdf_generator.document import Attachment, Bullets, Para
+from pdf_generator.optimize import count_pages, optimize_pdf
+
+pypdf = pytest.importorskip("pypdf")
+
+def _blocks(tmp_path):
+    from PIL import Image
+
+    # The same image under two paths (stored twice by ReportLab, once after optimizing)
+    for name in ("a.png", "b.png"):
+        Image.new("RGB", (40, 30), "#1f6feb").save(tmp_path / name)
+    (tmp_path / "notes.txt").write_text("attached notes " * 50, encoding="utf-8")
+
+    yield Para("Optimize round trip", "h1")
+    for i in range(60):
+        yield Para(f'Line {i} with <a href="https://example.com/{i}">link {i}</a> and <b>bold</b> text.', "body")
+    yield Bullets(["first", "second"])
+    yield Attachment(tmp_path / "a.png", "a.png", "image/png")
+    yield Attachment(tmp_path / "b.png", "b.png", "image/png")
+    yield Attachment(tmp_path / "notes.txt", "notes.txt", "text/plain")
+
+def _text(pdf: bytes):
+    reader = pypdf.PdfReader(io.BytesIO(pdf), strict=True)
+    return [page.extract_text() for page in reader.pages], reader
+
+@pytest.mark.parametrize("embed_fonts", [None, ""])
+def test_optimized_pdf_parses_with_same_pages_and_text(tmp_path, embed_fonts):
+    if embed_fonts is not None:
+        from pdf_generator.styles import register_embedded_fonts
+        try:
+            register_embedded_fonts()
+        except FileNotFoundError:
+            pytest.skip("no DejaVuSans.ttf on this system")
+    out = tmp_path / "t.pdf"
+    get_backend("pdf", embed_fonts=embed_fonts).write(_blocks(tmp_path), out, title="t")
+    original = out.read_bytes()
+    optimized = optimize_pdf(original)
+
+    assert len(optimized) < len(original)
+    before, _ = _text(original)
+    after, reader = _text(optimized)
+    assert len(after) == len(before) == count_pages(optimized) > 1
+    assert after == before
+    assert "link 59" in "".join(after)
+
+    annots = [a.get_object() for page in reader.pages for a in page.get("/Annots", [])]
+    assert sum(1 for a in annots if a["/Subtype"] == "/Link") == 60
+    assert [a["/Contents"] for a in annots if a["/Subtype"] == "/FileAttachment"] == ["notes.txt"]
+    assert reader.pages[-1]["/Resources"]  # images and fonts still resolve
+    images = [x for page in reader.pages for x in page.images]
+    assert len(images) == 2 and images[0].data == images[1].data
+
+def test_other_pdfs_are_returned_unchanged():
+    assert optimize_pdf(b"%PDF-1.7\nnot something ReportLab wrote") == b"%PDF-1.7\nnot something ReportLab wrote"
@@ -0,0 +1,19 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Font registration errors are exceptions for the caller (make-pdfs main) to report.
+"""
+
+import pytest
+
+from pdf_generator.styles import register_embedded_fonts
+
+def test_missing_font_dir(tmp_path):
+    with pytest.raises(FileNotFoundError, match="No DejaVuSans.ttf found"):
+        register_embedded_fonts(str(tmp_path))
+
+def test_broken_font_file(tmp_path):
+    (tmp_path / "Broken.ttf").write_bytes(b"not a font")
+    with pytest.raises(ValueError, match="Cannot load font"):
+        register_embedded_fonts(str(tmp_path), family="Broken")
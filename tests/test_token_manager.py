@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+TokenManager against a local stand-in for the ClickUp OAuth token endpoint.
+"""
+
+import os
+import json
+import stat
+import time
+import threading
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs
+
+import pytest
+
+from oauth.token_manager import Token, TokenCache, TokenManager
+
+class _TokenEndpoint(BaseHTTPRequestHandler):
+    calls = []  # parsed form bodies, in order
+    expires_in = 60
+    delay = 0.0
+
+    def do_POST(self):
+        body = parse_qs(self.rfile.read(int(self.headers["Content-Length"])).decode())
+        form = {k: v[0] for k, v in body.items()}
+        type(self).calls.append(form)
+        n = len(type(self).calls)
+        time.sleep(self.delay)
+        if form.get("client_secret") != "secret":
+            self.send_response(401)
+            self.end_headers()
+            return
+        # expires_in defaults to below the refresh margin, so the next lookup refreshes
+        payload = {"access_token": f"access-{n}", "refresh_token": f"refresh-{n}", "expires_in": self.expires_in}
+        data = json.dumps(payload).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+@pytest.fixture
+def endpoint():
+    _TokenEndpoint.calls = []
+    _TokenEndpoint.expires_in, _TokenEndpoint.delay = 60, 0.0
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _TokenEndpoint)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_port}/oauth/token", _TokenEndpoint.calls
+    server.shutdown()
+    server.server_close()
+
+def _manager(tmp_path, url, **kw):
+    return TokenManager(client_id="id", client_secret="secret", api_key="pk_key",
+                        cache_path=tmp_path / "tokens.json", token_url=url, **kw)
+
+def test_exchange_caches_token(tmp_path, endpoint):
+    url, calls = endpoint
+    manager = _manager(tmp_path, url, margin=0)
+    token = manager.exchange_code("111", "the-code")
+
+    assert token.access_token == "access-1"
+    assert calls == [{"client_id": "id", "client_secret": "secret", "code": "the-code"}]
+    assert manager.authorization("111") == "Bearer access-1"
+    # Persisted for other processes, readable by the owner only
+    assert TokenCache(tmp_path / "tokens.json").get("111").refresh_token == "refresh-1"
+    assert stat.S_IMODE(os.stat(tmp_path / "tokens.json").st_mode) == 0o600
+
+def test_refresh_on_expiry(tmp_path, endpoint):
+    url, calls = endpoint
+    manager = _manager(tmp_path, url)
+    manager.exchange_code("111", "the-code")
+
+    assert manager.authorization("111") == "Bearer access-2"
+    assert calls[1] == {"client_id": "id", "client_secret": "secret",
+                        "grant_type": "refresh_token", "refresh_token": "refresh-1"}
+    assert TokenCache(tmp_path / "tokens.json").get("111").access_token == "access-2"
+
+    # A fresh manager (another run) picks the refreshed token up from disk
+    other = _manager(tmp_path, url, margin=0)
+    assert other.authorization("111") == "Bearer access-2"
+    assert len(calls) == 2
+
+def test_per_team_fallback_to_api_key(tmp_path, endpoint, monkeypatch):
+    url, calls = endpoint
+    manager = _manager(tmp_path, url, margin=0)
+    manager.exchange_code("111", "the-code")
+
+    assert manager.authorization("111") == "Bearer access-1"
+    assert manager.authorization("222") == "pk_key"
+    assert manager.authorization(None) == "pk_key"
+    assert manager.session("111") is not manager.session("222")
+
+    # The miss for team 222 is remembered instead of re-reading tokens.json
+    reads = []
+    monkeypatch.setattr(TokenCache, "_read", lambda self: reads.append(1) or {})
+    assert manager.authorization("222") == "pk_key"
+    assert reads == []
+
+    # Authorizing the team later replaces the remembered miss
+    monkeypatch.undo()
+    manager.exchange_code("222", "other-code")
+    assert manager.authorization("222") == "Bearer access-2"
+
+def test_no_credentials(tmp_path, endpoint):
+    url, _ = endpoint
+    manager = TokenManager(cache_path=tmp_path / "tokens.json", token_url=url)
+    with pytest.raises(RuntimeError, match="No credentials"):
+        manager.authorization("111")
+
+def test_concurrent_requests_refresh_once(tmp_path, endpoint):
+    url, calls = endpoint
+    manager = _manager(tmp_path, url)
+    manager.exchange_code("111", "the-code")
+    # The refreshed token lasts; the endpoint is slow enough for every thread to see the old one
+    _TokenEndpoint.expires_in, _TokenEndpoint.delay = 3600, 0.2
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        headers = list(pool.map(lambda _: manager.authorization("111"), range(8)))
+
+    assert headers == ["Bearer access-2"] * 8
+    assert [c.get("refresh_token") for c in calls[1:]] == ["refresh-1"]
+
+def _put_teams(path, prefix, count):
+    cache = TokenCache(path)
+    for i in range(count):
+        cache.put(f"{prefix}{i}", Token(access_token=f"{prefix}{i}"))
+
+def test_concurrent_runs_keep_each_others_entries(tmp_path):
+    pytest.importorskip("fcntl")
+    path = tmp_path / "tokens.json"
+    ctx = multiprocessing.get_context("fork")
+    runs = [ctx.Process(target=_put_teams, args=(path, prefix, 40)) for prefix in "ab"]
+    for p in runs:
+        p.start()
+    for p in runs:
+        p.join()
+    assert sorted(TokenCache(path).teams()) == sorted(f"{p}{i}" for p in "ab" for i in range(40))